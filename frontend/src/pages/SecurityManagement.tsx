@@ -907,11 +907,17 @@ const RolePermissionsCRUD: React.FC<RolePermissionsCRUDProps> = ({ filterRoleId
   const [showModal, setShowModal] = useState<boolean>(false);
   const [submitting, setSubmitting] = useState(false);
   const [formData, setFormData] = useState({ role_id: '', permission_id: '' });
+  // Permisos marcados en la matriz y aún sin guardar (null: sin cambios)
+  const [selectedIds, setSelectedIds] = useState<Set<number> | null>(null);
 
   useEffect(() => {
     fetchData();
   }, []);
 
+  useEffect(() => {
+    setSelectedIds(null);
+  }, [filterRoleId]);
+
   const fetchData = async () => {
     try {
       setLoading(true);
@@ -988,22 +994,38 @@ const RolePermissionsCRUD: React.FC<RolePermissionsCRUDProps> = ({ filterRoleId
     return rolePermissions.some(rp => rp.role_id === roleId && rp.permission_id === permissionId);
   };
 
-  // Función para toggle de permisos en la matriz
-  const togglePermission = async (roleId: number, permissionId: number, currentlyHas: boolean) => {
+  const isChecked = (roleId: number, permissionId: number): boolean => {
+    return selectedIds ? selectedIds.has(permissionId) : hasPermission(roleId, permissionId);
+  };
+
+  // Función para toggle de permisos en la matriz; los cambios se guardan juntos
+  const togglePermission = (roleId: number, permissionId: number) => {
+    const next = new Set(
+      selectedIds ?? rolePermissions.filter(rp => rp.role_id === roleId).map(rp => rp.permission_id)
+    );
+    if (next.has(permissionId)) {
+      next.delete(permissionId);
+    } else {
+      next.add(permissionId);
+    }
+    setSelectedIds(next);
+  };
+
+  // Guarda la matriz completa del rol en una sola petición
+  const savePermissions = async (roleId: number) => {
+    if (!selectedIds) return;
+
     try {
-      if (currentlyHas) {
-        // Eliminar permiso
-        await rolePermissionService.deleteRolePermission(roleId, permissionId);
-        toast.success('Permiso eliminado exitosamente');
-      } else {
-        // Agregar permiso
-        await rolePermissionService.createRolePermission(roleId, permissionId);
-        toast.success('Permiso asignado exitosamente');
-      }
+      setSubmitting(true);
+      await rolePermissionService.replaceRolePermissions(roleId, Array.from(selectedIds));
+      setSelectedIds(null);
       await fetchData();
+      toast.success('Permisos guardados exitosamente');
     } catch (error: any) {
-      console.error('Error toggling permission:', error);
-      toast.error(error.message || 'Error al modificar el permiso');
+      console.error('Error saving role permissions:', error);
+      toast.error(error.message || 'Error al guardar los permisos');
+    } finally {
+      setSubmitting(false);
     }
   };
 
@@ -1043,6 +1065,14 @@ const RolePermissionsCRUD: React.FC<RolePermissionsCRUDProps> = ({ filterRoleId
             >
               Volver
             </button>
+            <button
+              onClick={() => savePermissions(roleId)}
+              disabled={!selectedIds || submitting}
+              className="px-4 py-2 bg-green-700 text-white rounded-lg hover:bg-green-800 transition-all shadow-lg font-semibold text-sm disabled:opacity-50 disabled:cursor-not-allowed"
+              style={{ backgroundColor: '#15803d', color: '#FFFFFF' }}
+            >
+              {submitting ? 'Guardando...' : 'Guardar cambios'}
+            </button>
           </div>
         </div>
 
@@ -1088,8 +1118,8 @@ const RolePermissionsCRUD: React.FC<RolePermissionsCRUDProps> = ({ filterRoleId
                     <td className="px-6 py-4 text-center">
                       <input
                         type="checkbox"
-                        checked={hasPermission(roleId, permission.id)}
-                        onChange={() => togglePermission(roleId, permission.id, hasPermission(roleId, permission.id))}
+                        checked={isChecked(roleId, permission.id)}
+                        onChange={() => togglePermission(roleId, permission.id)}
                         className="w-5 h-5 text-blue-600 bg-gray-100 border-gray-300 rounded focus:ring-blue-500 focus:ring-2 cursor-pointer"
                       />
                     </td>
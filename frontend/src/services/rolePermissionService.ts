@@ -42,6 +42,15 @@ class RolePermissionService {
     }
   }
 
+  async replaceRolePermissions(roleId: number, permissionIds: number[]): Promise<void> {
+    try {
+      await api.put(`/role-permissions/role/${roleId}`, { permission_ids: permissionIds });
+    } catch (error) {
+      console.error("Error al guardar los permisos del rol:", error);
+      throw error;
+    }
+  }
+
   async deleteRolePermission(roleId: number, permissionId: number): Promise<void> {
     try {
       await api.delete(`/role-permissions/role/${roleId}/permission/${permissionId}`);
@@ -1,7 +1,21 @@
 import os
 from flask import Flask, request
 from app.data.database import db, migrate
+from app.data.schema import upgrade_schema
 from app.config import Config
+from app.business.models.rbac_version import RBACVersion
+from app.business.services.effective_permissions import EffectivePermissionService
+from app.business.services.session_store import create_session_store
+from app.business.services.rate_limiter import create_rate_limiter, SQLiteTokenBucketLimiter
+from app.business.services.session_validator import SessionValidator
+from app.business.services.session_reaper import session_reaper
+from app.business.services.revocation_list import revocation_list
+from app.business.services.activity_tracker import activity_tracker
+from app.business.services.password_hasher import calibrate, calibrated_method
+from app.business.services.breached_passwords import open_breached_passwords, build_bloom
+from app.business.services.password_expiry import password_expiry_sweep
+from app.business.services.scheduler import schedule
+from app.presentation.authorization_middleware import enforce_permissions
 from flask_cors import CORS
 
 def create_app(config_class=Config):
@@ -12,6 +26,34 @@ def create_app(config_class=Config):
     db.init_app(app)
     migrate.init_app(app, db)
 
+    # Almacén de sesiones (ver SESSION_STORE)
+    app.extensions['session_store'] = create_session_store(app.config['SESSION_STORE'])
+
+    # Limitador de intentos de autenticación (ver AUTH_RATE_LIMIT_*)
+    app.extensions['rate_limiter'] = create_rate_limiter(app.config)
+
+    # Calibrar el costo del hash de contraseñas (ver PASSWORD_HASH_CALIBRATE)
+    if app.config['PASSWORD_HASH_CALIBRATE']:
+        app.config['PASSWORD_HASH_METHOD'] = calibrated_method(
+            app.config['PASSWORD_HASH_CALIBRATION_FILE'],
+            app.config['PASSWORD_HASH_TARGET_MS'] / 1000, app.config['PASSWORD_HASH_MIN_ITERATIONS'])
+        app.logger.info("Password hash method calibrated to %s", app.config['PASSWORD_HASH_METHOD'])
+
+    @app.cli.command('calibrate-password-hash')
+    def calibrate_password_hash():
+        """Print a PASSWORD_HASH_METHOD that meets PASSWORD_HASH_TARGET_MS on this machine"""
+        print(calibrate(app.config['PASSWORD_HASH_TARGET_MS'] / 1000, app.config['PASSWORD_HASH_MIN_ITERATIONS']))
+
+    # Lista local de contraseñas filtradas (ver PASSWORD_BREACH_*)
+    app.extensions['breached_passwords'] = open_breached_passwords(app.config)
+
+    @app.cli.command('build-breach-bloom')
+    def build_breach_bloom():
+        """Write the Bloom filter of PASSWORD_BREACH_LIST_PATH to PASSWORD_BREACH_BLOOM_PATH"""
+        bloom = build_bloom(app.config['PASSWORD_BREACH_LIST_PATH'], app.config['PASSWORD_BREACH_BLOOM_BITS'])
+        bloom.save(app.config['PASSWORD_BREACH_BLOOM_PATH'])
+        print(f"{bloom.size_bits} bits, {bloom.hashes} hashes")
+
     # Crear carpetas si no existen
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
@@ -24,6 +66,9 @@ def create_app(config_class=Config):
         if request.method == 'OPTIONS':
             return '', 200
 
+    # Verificación de permisos (opcional, ver RBAC_ENFORCE)
+    app.before_request(enforce_permissions)
+
     @app.after_request
     def add_cors_headers(response):
         response.headers["Access-Control-Allow-Origin"] = "*"
@@ -46,6 +91,7 @@ def create_app(config_class=Config):
     from app.presentation.routes.permission_routes import permission_bp
     from app.presentation.routes.user_role_routes import user_role_bp
     from app.presentation.routes.role_permission_routes import role_permission_bp
+    from app.presentation.routes.authorization_routes import authorization_bp
 
     app.register_blueprint(user_bp, url_prefix='/api/users')
     app.register_blueprint(profile_bp, url_prefix='/api/profiles')
@@ -60,9 +106,30 @@ def create_app(config_class=Config):
     app.register_blueprint(permission_bp, url_prefix='/api/permissions')
     app.register_blueprint(user_role_bp, url_prefix='/api/user-roles')
     app.register_blueprint(role_permission_bp, url_prefix='/api/role-permissions')
+    app.register_blueprint(authorization_bp, url_prefix='/api/authorize')
 
     # Crear tablas
     with app.app_context():
         db.create_all()
+        # Columnas e índices nuevos en tablas existentes
+        added = upgrade_schema()
+        if added:
+            app.logger.info("Schema upgraded: %s", ", ".join(added))
+        RBACVersion.ensure_scopes()
+        EffectivePermissionService.rebuild_if_empty()
+        SessionValidator.backfill_hashes()
+
+    # Tareas periódicas
+    schedule(app, 'effective-permissions', app.config['EFFECTIVE_PERMISSIONS_REFRESH_INTERVAL'],
+             EffectivePermissionService.refresh_windows)
+    schedule(app, 'session-reaper', app.config['SESSION_REAPER_INTERVAL'], session_reaper.reap)
+    schedule(app, 'session-activity', app.config['SESSION_ACTIVITY_FLUSH_INTERVAL'],
+             activity_tracker.flush, run_at_exit=True)
+    schedule(app, 'password-expiry', app.config['PASSWORD_EXPIRY_SWEEP_INTERVAL'], password_expiry_sweep.sweep)
+    if isinstance(app.extensions['rate_limiter'], SQLiteTokenBucketLimiter):
+        schedule(app, 'rate-limit-prune', 3600, app.extensions['rate_limiter'].prune)
+    if app.config['SESSION_TOKEN_MODE'] == 'signed':
+        schedule(app, 'session-revocations', app.config['SESSION_REVOCATION_REFRESH_INTERVAL'],
+                 revocation_list.refresh)
 
     return app
@@ -0,0 +1,101 @@
+from app.business.services.rbac_engine import rbac_engine
+from app.business.services.effective_permissions import EffectivePermissionService
+from app.business.services import permission_enforcer
+from sqlalchemy.exc import SQLAlchemyError
+
+
+def _is_user_id(value):
+    # JSON true/false arrive as bool, which is a subclass of int
+    return isinstance(value, int) and not isinstance(value, bool)
+
+class AuthorizationController:
+    @staticmethod
+    def authorize(data):
+        """Check whether a user may call a URL with a given method"""
+        try:
+            if not data or 'user_id' not in data or 'url' not in data or 'method' not in data:
+                return {"error": "user_id, url and method are required"}, 400
+            if not _is_user_id(data['user_id']):
+                return {"error": "user_id must be an integer"}, 400
+            if not isinstance(data['url'], str) or not isinstance(data['method'], str):
+                return {"error": "url and method must be strings"}, 400
+
+            decision = rbac_engine.authorize(data['user_id'], data['url'], data['method'])
+            return decision, 200
+        except SQLAlchemyError as e:
+            return {"error": str(e)}, 500
+
+    @staticmethod
+    def authorize_batch(data):
+        """Check many URL/method pairs for one user in a single call"""
+        try:
+            if not data or 'user_id' not in data or not isinstance(data.get('checks'), list):
+                return {"error": "user_id and a checks list are required"}, 400
+            if not _is_user_id(data['user_id']):
+                return {"error": "user_id must be an integer"}, 400
+
+            pairs = []
+            for check in data['checks']:
+                if isinstance(check, dict) and 'url' in check and 'method' in check:
+                    pairs.append((check['url'], check['method']))
+                elif isinstance(check, (list, tuple)) and len(check) == 2:
+                    pairs.append((check[0], check[1]))
+                else:
+                    return {"error": "Each check needs a url and a method"}, 400
+                if not isinstance(pairs[-1][0], str) or not isinstance(pairs[-1][1], str):
+                    return {"error": "url and method must be strings"}, 400
+
+            results = rbac_engine.authorize_many(data['user_id'], pairs)
+            return {"user_id": data['user_id'], "results": results}, 200
+        except SQLAlchemyError as e:
+            return {"error": str(e)}, 500
+
+    @staticmethod
+    def get_user_permission_set(user_id):
+        """Get a user's effective permissions as a serialized bitset"""
+        try:
+            permission_set = rbac_engine.user_permission_set(user_id)
+            return {
+                "user_id": user_id,
+                "permission_set": permission_set.serialize(),
+                "count": len(permission_set)
+            }, 200
+        except SQLAlchemyError as e:
+            return {"error": str(e)}, 500
+
+    @staticmethod
+    def reload():
+        """Recompile the in-memory authorization tables from the database"""
+        try:
+            tables = rbac_engine.load()
+            return {
+                "message": "Authorization tables reloaded",
+                "roles": len(tables.roles),
+                "permissions": len(tables.permissions),
+                "users": len(tables.user_roles)
+            }, 200
+        except SQLAlchemyError as e:
+            return {"error": str(e)}, 500
+
+    @staticmethod
+    def get_user_permissions(user_id):
+        """Get the permissions a user currently holds"""
+        try:
+            permissions = EffectivePermissionService.get_for_user(user_id)
+            return [permission.to_dict() for permission in permissions], 200
+        except SQLAlchemyError as e:
+            return {"error": str(e)}, 500
+
+    @staticmethod
+    def has_permission(user_id, permission_id):
+        """Check a single permission against the materialized effective permissions"""
+        try:
+            allowed = EffectivePermissionService.has_permission(user_id, permission_id)
+            return {"user_id": user_id, "permission_id": permission_id, "allowed": bool(allowed)}, 200
+        except SQLAlchemyError as e:
+            return {"error": str(e)}, 500
+
+    @staticmethod
+    def get_metrics():
+        """Get per-check latency and cache counters of permission enforcement"""
+        return permission_enforcer.get_metrics(), 200
@@ -1,10 +1,7 @@
-import os
-import uuid
-from flask import current_app
-from werkzeug.utils import secure_filename
 from app.data.database import db
 from app.business.models.digital_signature import DigitalSignature
 from app.business.models.user import User
+from app.business.services.blob_store import blob_store
 from sqlalchemy.exc import SQLAlchemyError
 
 class DigitalSignatureController:
@@ -56,15 +53,12 @@ class DigitalSignatureController:
             if not photo:
                 return {"error": "Digital signature image is required"}, 400
                 
-            filename = secure_filename(f"{uuid.uuid4()}_{photo.filename}")
-            photo_path = os.path.join('digital-signatures', filename)
-            os.makedirs(os.path.join(current_app.config['UPLOAD_FOLDER'], 'signatures'), exist_ok=True)
-            photo.save(os.path.join(current_app.config['UPLOAD_FOLDER'], photo_path))
-            photo_path = photo_path.replace('\\', '/')
+            photo_path, photo_hash = blob_store.store(photo, 'digital-signatures')
 
             new_signature = DigitalSignature(
                 user_id=user_id,
-                photo=photo_path
+                photo=photo_path,
+                photo_hash=photo_hash
             )
             
             db.session.add(new_signature)
@@ -86,19 +80,10 @@ class DigitalSignatureController:
             if not photo:
                 return {"error": "Digital signature image is required"}, 400
                 
-            # If there's an existing photo, delete it
-            if signature.photo:
-                old_photo_path = os.path.join(current_app.config['UPLOAD_FOLDER'], signature.photo)
-                if os.path.exists(old_photo_path):
-                    os.remove(old_photo_path)
-            
-            # Save the new photo
-            filename = secure_filename(f"{uuid.uuid4()}_{photo.filename}")
-            photo_path = os.path.join('digital-signatures', filename)
-            photo.save(os.path.join(current_app.config['UPLOAD_FOLDER'], photo_path))
-            photo_path=photo_path.replace('\\', '/')
-
-            signature.photo = photo_path
+            # Save the new photo, then let go of the old one
+            old_photo_path = signature.photo
+            signature.photo, signature.photo_hash = blob_store.store(photo, 'digital-signatures')
+            blob_store.release(old_photo_path)
                 
             db.session.commit()
             return signature.to_dict(), 200
@@ -114,11 +99,8 @@ class DigitalSignatureController:
             if not signature:
                 return {"error": "Digital signature not found"}, 404
             
-            # Delete the photo file if it exists
-            if signature.photo:
-                photo_path = os.path.join(current_app.config['UPLOAD_FOLDER'], signature.photo)
-                if os.path.exists(photo_path):
-                    os.remove(photo_path)
+            # Delete the photo file if nothing else uses it
+            blob_store.release(signature.photo)
             
             db.session.delete(signature)
             db.session.commit()
@@ -3,7 +3,10 @@ from app.data.database import db
 from app.business.models.password import Password
 from app.business.models.user import User
 from sqlalchemy.exc import SQLAlchemyError
-from werkzeug.security import generate_password_hash
+from app.business.services.password_hasher import password_hasher, needs_rehash, HashingBusyError
+from app.business.services.password_expiry import password_expiry_sweep
+from app.business.services.breached_passwords import get_breached_passwords
+from flask import current_app
 
 class PasswordController:
     @staticmethod
@@ -39,13 +42,7 @@ class PasswordController:
     def get_current_password(user_id):
         """Get the current active password for a user"""
         try:
-            # Current password is the one with startAt <= now and endAt is either NULL or > now
-            now = datetime.utcnow()
-            password = Password.query.filter_by(user_id=user_id)\
-                .filter(Password.startAt <= now)\
-                .filter((Password.endAt == None) | (Password.endAt > now))\
-                .order_by(Password.startAt.desc())\
-                .first()
+            password = PasswordController._current_password(user_id=user_id)
             
             if not password:
                 return {"error": "No active password found for this user"}, 404
@@ -54,6 +51,42 @@ class PasswordController:
         except SQLAlchemyError as e:
             return {"error": str(e)}, 500
 
+    @staticmethod
+    def verify(user_id, data):
+        """Check a password against the user's current one, upgrading its hash if outdated"""
+        try:
+            if not data or 'content' not in data:
+                return {"error": "Password content is required"}, 400
+            if not isinstance(data['content'], str):
+                return {"error": "content must be a string"}, 400
+
+            password = PasswordController._current_password(user_id=user_id)
+            return PasswordController._check(password, data['content'])
+        except HashingBusyError as e:
+            db.session.rollback()
+            return {"error": str(e)}, 503
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            return {"error": str(e)}, 500
+
+    @staticmethod
+    def verify_credentials(data):
+        """Check an email and password pair"""
+        try:
+            if not data or 'email' not in data or 'content' not in data:
+                return {"error": "email and content are required"}, 400
+            if not isinstance(data['email'], str) or not isinstance(data['content'], str):
+                return {"error": "email and content must be strings"}, 400
+
+            password = PasswordController._current_password(email=data['email'])
+            return PasswordController._check(password, data['content'])
+        except HashingBusyError as e:
+            db.session.rollback()
+            return {"error": str(e)}, 503
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            return {"error": str(e)}, 500
+
     @staticmethod
     def create(user_id, data):
         """Create a new password for a user"""
@@ -70,28 +103,40 @@ class PasswordController:
                 return {"error": "startAt content is required"}, 400
             if 'endAt' not in data:
                 return {"error": "endAt content is required"}, 400
+            if not isinstance(data['content'], str):
+                return {"error": "content must be a string"}, 400
             
+            if PasswordController._is_breached(data['content']):
+                return {"error": "Password appears in a known data breach, choose a different one"}, 400
+            if PasswordController._was_used_recently(user_id, data['content']):
+                return {"error": "Password was used recently, choose a different one"}, 400
+
             # If this is a new password, end the current one
             current_password = Password.query.filter_by(user_id=user_id, endAt=None).first()
             if current_password:
                 current_password.endAt = datetime.utcnow()
             startAt=datetime.strptime(data.get('startAt'), "%Y-%m-%d %H:%M:%S")
             endAt=datetime.strptime(data.get('endAt'), "%Y-%m-%d %H:%M:%S")
+            # Hash once, for the history row and the user's current password
+            password_hash = password_hasher.hash(data['content'])
             # Create the new password record
             new_password = Password(
                 user_id=user_id,
-                content=generate_password_hash(data['content']),
+                content=password_hash,
                 startAt=startAt,
                 endAt=endAt
             )
             
             # Update the user's current password too
-            user.password = generate_password_hash(data['content'])
+            user.password = password_hash
             
             db.session.add(new_password)
             db.session.commit()
             
             return new_password.to_dict(), 201
+        except HashingBusyError as e:
+            db.session.rollback()
+            return {"error": str(e)}, 503
         except SQLAlchemyError as e:
             db.session.rollback()
             return {"error": str(e)}, 500
@@ -105,16 +150,27 @@ class PasswordController:
                 return {"error": "Password record not found"}, 404
             
             if 'content' in data:
-                password.content = generate_password_hash(data['content'])
+                if not isinstance(data['content'], str):
+                    return {"error": "content must be a string"}, 400
+                if PasswordController._is_breached(data['content']):
+                    return {"error": "Password appears in a known data breach, choose a different one"}, 400
+                if PasswordController._was_used_recently(password.user_id, data['content']):
+                    return {"error": "Password was used recently, choose a different one"}, 400
+                password.content = password_hasher.hash(data['content'])
             if 'startAt' in data:
                 startAt = datetime.strptime(data.get('startAt'), "%Y-%m-%d %H:%M:%S")
                 password.startAt = startAt
             if 'endAt' in data:
                 endAt = datetime.strptime(data.get('endAt'), "%Y-%m-%d %H:%M:%S")
                 password.endAt = endAt
+                # Let the expiry sweep look at it again
+                password.expirySweptAt = None
                 
             db.session.commit()
             return password.to_dict(), 200
+        except HashingBusyError as e:
+            db.session.rollback()
+            return {"error": str(e)}, 503
         except SQLAlchemyError as e:
             db.session.rollback()
             return {"error": str(e)}, 500
@@ -133,4 +189,69 @@ class PasswordController:
             return {"message": "Password record deleted successfully"}, 200
         except SQLAlchemyError as e:
             db.session.rollback()
-            return {"error": str(e)}, 500
\ No newline at end of file
+            return {"error": str(e)}, 500
+
+    @staticmethod
+    def sweep_expired():
+        """Flag the sessions of users whose password expired"""
+        try:
+            result = password_expiry_sweep.sweep()
+            result['metrics'] = password_expiry_sweep.get_metrics()
+            return result, 200
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            return {"error": str(e)}, 500
+
+    @staticmethod
+    def _is_breached(content):
+        """Whether ``content`` is in the PASSWORD_BREACH_LIST_PATH list, when one is configured"""
+        breached_passwords = get_breached_passwords()
+        return breached_passwords is not None and breached_passwords.is_breached(content)
+
+    @staticmethod
+    def _was_used_recently(user_id, content):
+        """Whether ``content`` matches one of the user's last PASSWORD_HISTORY_SIZE passwords"""
+        history_size = current_app.config['PASSWORD_HISTORY_SIZE']
+        if history_size <= 0:
+            return False
+        recent = db.session.query(Password.content)\
+            .filter_by(user_id=user_id)\
+            .order_by(Password.startAt.desc())\
+            .limit(history_size)\
+            .all()
+        return password_hasher.matches_any(content, [password_hash for (password_hash,) in recent])
+
+    @staticmethod
+    def _current_password(user_id=None, email=None):
+        """The user's current password, found by user id or email.
+
+        Current is startAt <= now and endAt NULL or > now; the newest one wins.
+        With the (user_id, startAt, endAt) index this is a single index probe,
+        also when the user is first found by email in the same query.
+        """
+        now = datetime.utcnow()
+        query = Password.query
+        if email is not None:
+            query = query.join(User, User.id == Password.user_id).filter(User.email == email)
+        else:
+            query = query.filter(Password.user_id == user_id)
+        return query\
+            .filter(Password.startAt <= now)\
+            .filter((Password.endAt == None) | (Password.endAt > now))\
+            .order_by(Password.startAt.desc())\
+            .first()
+
+    @staticmethod
+    def _check(password, content):
+        """One hash verify; re-hash outdated hashes on success"""
+        if not password:
+            # Spend a hash check anyway so timing does not tell unknown accounts apart
+            password_hasher.verify(password_hasher.dummy_hash(), content)
+            return {"valid": False, "error": "Invalid credentials"}, 401
+        if not password_hasher.verify(password.content, content):
+            return {"valid": False, "error": "Invalid credentials"}, 401
+
+        if needs_rehash(password.content, current_app.config['PASSWORD_HASH_METHOD']):
+            password.content = password_hasher.hash(content)
+            db.session.commit()
+        return {"valid": True, "user_id": password.user_id}, 200
@@ -2,6 +2,9 @@ from app.data.database import db
 from app.business.models.permission import Permission
 from sqlalchemy.exc import SQLAlchemyError
 from app.business.models.role_permission import RolePermission
+from app.business.models.rbac_version import RBACVersion
+from app.business.services.rbac_engine import rbac_engine
+from app.business.services.effective_permissions import EffectivePermissionService
 class PermissionController:
     @staticmethod
     def get_all():
@@ -48,7 +51,9 @@ class PermissionController:
             )
             
             db.session.add(new_permission)
+            RBACVersion.bump('permissions')
             db.session.commit()
+            rbac_engine.permission_saved(new_permission.id, new_permission.url, new_permission.method, new_permission.entity)
             
             return new_permission.to_dict(), 201
         except SQLAlchemyError as e:
@@ -86,7 +91,9 @@ class PermissionController:
             if 'entity' in data:
                 permission.entity = data['entity']
                 
+            RBACVersion.bump('permissions')
             db.session.commit()
+            rbac_engine.permission_saved(permission.id, permission.url, permission.method, permission.entity)
             return permission.to_dict(), 200
         except SQLAlchemyError as e:
             db.session.rollback()
@@ -100,38 +107,75 @@ class PermissionController:
             if not permission:
                 return {"error": "Permission not found"}, 404
             
+            EffectivePermissionService.remove_permission(permission_id)
             db.session.delete(permission)
+            RBACVersion.bump('permissions', 'role_permissions')
             db.session.commit()
+            rbac_engine.permission_deleted(permission_id)
+            rbac_engine.mark_stale()
             
             return {"message": "Permission deleted successfully"}, 200
         except SQLAlchemyError as e:
             db.session.rollback()
             return {"error": str(e)}, 500
+    # role_id -> grouped matrix, valid for the RBAC versions in _grouped_cache_key
+    _grouped_cache = {}
+    _grouped_cache_key = None
+    _GROUPED_CACHE_SIZE = 1024
+
+    @staticmethod
+    def _grouped_versions():
+        versions = rbac_engine.versions()
+        return versions.get('permissions'), versions.get('role_permissions')
+
+    @staticmethod
+    def get_grouped_permissions_etag(role_id):
+        """ETag of a role's permission matrix, derived from the RBAC versions only"""
+        permissions_version, role_permissions_version = PermissionController._grouped_versions()
+        return f"grouped-{role_id}-{permissions_version}-{role_permissions_version}"
+
     @staticmethod
     def get_grouped_permissions(role_id):
         """Obtiene los permisos agrupados por entidad e indica si el rol tiene cada permiso"""
         try:
-            # Obtener todos los permisos
-            permissions = Permission.query.all()
+            key = PermissionController._grouped_versions()
+            if key != PermissionController._grouped_cache_key:
+                PermissionController._grouped_cache = {}
+                PermissionController._grouped_cache_key = key
+            cache = PermissionController._grouped_cache
+            if role_id in cache:
+                return cache[role_id], 200
 
-            # Obtener todos los ID de permisos asociados al rol
-            role_permission_ids = db.session.query(RolePermission.permission_id)\
-                                            .filter_by(role_id=role_id)\
-                                            .all()
-            role_permission_ids = set(pid for (pid,) in role_permission_ids)
+            # Una sola consulta: todos los permisos con un LEFT JOIN a los del rol
+            rows = db.session.query(
+                Permission.id,
+                Permission.url,
+                Permission.method,
+                Permission.entity,
+                Permission.created_at,
+                Permission.updated_at,
+                RolePermission.id.isnot(None)
+            ).outerjoin(
+                RolePermission,
+                (RolePermission.permission_id == Permission.id) & (RolePermission.role_id == role_id)
+            ).order_by(Permission.id).all()
 
             grouped = {}
-
-            for p in permissions:
-                permiso_dict = p.to_dict()
-                permiso_dict["has_permission"] = p.id in role_permission_ids
-
-                entity = p.entity
-                if entity not in grouped:
-                    grouped[entity] = []
-                grouped[entity].append(permiso_dict)
+            for pid, url, method, entity, created_at, updated_at, has_permission in rows:
+                grouped.setdefault(entity, []).append({
+                    'id': pid,
+                    'url': url,
+                    'method': method,
+                    'entity': entity,
+                    'created_at': created_at,
+                    'updated_at': updated_at,
+                    'has_permission': bool(has_permission)
+                })
 
             result = [{"entity": entity, "permissions": perms} for entity, perms in grouped.items()]
+            if len(cache) >= PermissionController._GROUPED_CACHE_SIZE:
+                cache.clear()
+            cache[role_id] = result
             return result, 200
 
         except SQLAlchemyError as e:
@@ -1,10 +1,7 @@
-import os
-import uuid
-from flask import current_app
-from werkzeug.utils import secure_filename
 from app.data.database import db
 from app.business.models.profile import Profile
 from app.business.models.user import User
+from app.business.services.blob_store import blob_store
 from sqlalchemy.exc import SQLAlchemyError
 
 class ProfileController:
@@ -52,18 +49,16 @@ class ProfileController:
             if Profile.query.filter_by(user_id=user_id).first():
                 return {"error": "User already has a profile"}, 400
             
-            photo_path = None
+            photo_path = photo_hash = None
             if photo:
                 # Save photo if provided
-                filename = secure_filename(f"{uuid.uuid4()}_{photo.filename}")
-                photo_path = os.path.join('profiles', filename)
-                photo_path = photo_path.replace('\\', '/')
-                photo.save(os.path.join(current_app.config['UPLOAD_FOLDER'], photo_path))
+                photo_path, photo_hash = blob_store.store(photo, 'profiles')
             
             new_profile = Profile(
                 user_id=user_id,
                 phone=data.get('phone', ''),
-                photo=photo_path
+                photo=photo_path,
+                photo_hash=photo_hash
             )
             
             db.session.add(new_profile)
@@ -86,18 +81,10 @@ class ProfileController:
                 profile.phone = data['phone']
                 
             if photo:
-                # If there's an existing photo, delete it
-                if profile.photo:
-                    old_photo_path = os.path.join(current_app.config['UPLOAD_FOLDER'], profile.photo)
-                    if os.path.exists(old_photo_path):
-                        os.remove(old_photo_path)
-                
-                # Save the new photo
-                filename = secure_filename(f"{uuid.uuid4()}_{photo.filename}")
-                photo_path = os.path.join('profiles', filename)
-                photo_path = photo_path.replace('\\', '/')
-                photo.save(os.path.join(current_app.config['UPLOAD_FOLDER'], photo_path))
-                profile.photo = photo_path
+                # Save the new photo, then let go of the old one
+                old_photo_path = profile.photo
+                profile.photo, profile.photo_hash = blob_store.store(photo, 'profiles')
+                blob_store.release(old_photo_path)
                 
             db.session.commit()
             return profile.to_dict(), 200
@@ -113,11 +100,8 @@ class ProfileController:
             if not profile:
                 return {"error": "Profile not found"}, 404
             
-            # Delete the photo file if it exists
-            if profile.photo:
-                photo_path = os.path.join(current_app.config['UPLOAD_FOLDER'], profile.photo)
-                if os.path.exists(photo_path):
-                    os.remove(photo_path)
+            # Delete the photo file if nothing else uses it
+            blob_store.release(profile.photo)
             
             db.session.delete(profile)
             db.session.commit()
@@ -1,5 +1,9 @@
 from app.data.database import db
 from app.business.models.role import Role
+from app.business.models.rbac_version import RBACVersion
+from app.business.services.rbac_engine import rbac_engine
+from app.business.services.effective_permissions import EffectivePermissionService
+from app.business.services.role_hierarchy import RoleHierarchyService, RoleHierarchyError
 from sqlalchemy.exc import SQLAlchemyError
 
 class RoleController:
@@ -41,7 +45,9 @@ class RoleController:
             )
             
             db.session.add(new_role)
+            RBACVersion.bump('roles')
             db.session.commit()
+            rbac_engine.mark_stale()
             
             return new_role.to_dict(), 201
         except SQLAlchemyError as e:
@@ -66,7 +72,9 @@ class RoleController:
             if 'description' in data:
                 role.description = data['description']
                 
+            RBACVersion.bump('roles')
             db.session.commit()
+            rbac_engine.mark_stale()
             return role.to_dict(), 200
         except SQLAlchemyError as e:
             db.session.rollback()
@@ -80,10 +88,79 @@ class RoleController:
             if not role:
                 return {"error": "Role not found"}, 404
             
+            descendants = RoleHierarchyService.remove_role(role_id)
+            EffectivePermissionService.remove_role(role_id)
             db.session.delete(role)
+            EffectivePermissionService.sync_roles(descendants)
+            RBACVersion.bump('roles', 'role_permissions', 'user_roles', 'role_hierarchy')
             db.session.commit()
+            rbac_engine.mark_stale()
             
             return {"message": "Role deleted successfully"}, 200
         except SQLAlchemyError as e:
             db.session.rollback()
-            return {"error": str(e)}, 500
\ No newline at end of file
+            return {"error": str(e)}, 500
+
+    @staticmethod
+    def set_parent(role_id, data):
+        """Make a role inherit the permissions of a parent role, or detach it"""
+        try:
+            if data is None or 'parent_id' not in data:
+                return {"error": "parent_id is required"}, 400
+            parent_id = data['parent_id']
+            # "3" would slip past the cycle check, which compares integer ids
+            if parent_id is not None and (not isinstance(parent_id, int) or isinstance(parent_id, bool)):
+                return {"error": "parent_id must be an integer or null"}, 400
+
+            role = Role.query.get(role_id)
+            if not role:
+                return {"error": "Role not found"}, 404
+            if parent_id is not None and not Role.query.get(parent_id):
+                return {"error": "Parent role not found"}, 404
+
+            try:
+                RoleHierarchyService.set_parent(role_id, parent_id)
+            except RoleHierarchyError as e:
+                return {"error": str(e)}, 400
+
+            affected = [descendant_id for descendant_id, _ in RoleHierarchyService.subtree(role_id)]
+            EffectivePermissionService.sync_roles(affected)
+            RBACVersion.bump('role_hierarchy')
+            db.session.commit()
+            rbac_engine.mark_stale()
+
+            result = role.to_dict()
+            result['parent_id'] = parent_id
+            return result, 200
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            return {"error": str(e)}, 500
+
+    @staticmethod
+    def get_hierarchy(role_id):
+        """Get a role's parent, ancestors and descendants"""
+        try:
+            role = Role.query.get(role_id)
+            if not role:
+                return {"error": "Role not found"}, 404
+
+            result = role.to_dict()
+            result['parent_id'] = RoleHierarchyService.get_parent_id(role_id)
+            result['ancestors'] = [ancestor_id for ancestor_id, _ in RoleHierarchyService.ancestors(role_id)]
+            result['descendants'] = [d for d, depth in RoleHierarchyService.subtree(role_id) if depth > 0]
+            return result, 200
+        except SQLAlchemyError as e:
+            return {"error": str(e)}, 500
+
+    @staticmethod
+    def get_permissions(role_id):
+        """Get all permissions of a role, including inherited ones"""
+        try:
+            role = Role.query.get(role_id)
+            if not role:
+                return {"error": "Role not found"}, 404
+
+            permissions = RoleHierarchyService.get_permissions(role_id)
+            return [permission.to_dict() for permission in permissions], 200
+        except SQLAlchemyError as e:
+            return {"error": str(e)}, 500
@@ -4,6 +4,9 @@ from app.data.database import db
 from app.business.models.role_permission import RolePermission
 from app.business.models.role import Role
 from app.business.models.permission import Permission
+from app.business.models.rbac_version import RBACVersion
+from app.business.services.rbac_engine import rbac_engine
+from app.business.services.effective_permissions import EffectivePermissionService
 from sqlalchemy.exc import SQLAlchemyError
 
 class RolePermissionController:
@@ -79,7 +82,10 @@ class RolePermissionController:
             )
             
             db.session.add(new_role_permission)
+            EffectivePermissionService.sync_role_permissions(role_id, [permission_id])
+            RBACVersion.bump('role_permissions')
             db.session.commit()
+            rbac_engine.mark_stale()
             
             return new_role_permission.to_dict(), 201
         except SQLAlchemyError as e:
@@ -87,6 +93,60 @@ class RolePermissionController:
             return {"error": str(e)}, 500
 
 
+    @staticmethod
+    def replace_for_role(role_id, data):
+        """Replace all permissions of a role with the given set in one transaction"""
+        try:
+            if not data or not isinstance(data.get('permission_ids'), list):
+                return {"error": "permission_ids list is required"}, 400
+            try:
+                desired = {int(pid) for pid in data['permission_ids']}
+            except (TypeError, ValueError):
+                return {"error": "permission_ids must be integers"}, 400
+
+            # Check if role exists
+            if db.session.query(Role.id).filter_by(id=role_id).first() is None:
+                return {"error": "Role not found"}, 404
+
+            # Check that every requested permission exists
+            found = {pid for (pid,) in db.session.query(Permission.id).filter(Permission.id.in_(desired))}
+            missing = desired - found
+            if missing:
+                return {"error": "Permission not found", "permission_ids": sorted(missing)}, 404
+
+            existing = {pid for (pid,) in db.session.query(RolePermission.permission_id).filter_by(role_id=role_id)}
+            to_add = sorted(desired - existing)
+            to_remove = sorted(existing - desired)
+
+            if to_remove:
+                db.session.execute(
+                    db.delete(RolePermission).where(
+                        RolePermission.role_id == role_id,
+                        RolePermission.permission_id.in_(to_remove)
+                    )
+                )
+            if to_add:
+                db.session.execute(
+                    db.insert(RolePermission),
+                    [{'id': str(uuid.uuid4()), 'role_id': role_id, 'permission_id': pid} for pid in to_add]
+                )
+
+            if to_add or to_remove:
+                EffectivePermissionService.sync_role_permissions(role_id, to_add + to_remove)
+                RBACVersion.bump('role_permissions')
+                db.session.commit()
+                rbac_engine.mark_stale()
+
+            return {
+                "role_id": role_id,
+                "permission_ids": sorted(desired),
+                "added": to_add,
+                "removed": to_remove
+            }, 200
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            return {"error": str(e)}, 500
+
     @staticmethod
     def delete(role_id, permission_id):
         """Delete a role-permission relationship by role and permission IDs"""
@@ -100,7 +160,10 @@ class RolePermissionController:
                 return {"error": "Role-Permission relationship not found"}, 404
             
             db.session.delete(role_permission)
+            EffectivePermissionService.sync_role_permissions(role_id, [permission_id])
+            RBACVersion.bump('role_permissions')
             db.session.commit()
+            rbac_engine.mark_stale()
             
             return {"message": "Role-Permission relationship deleted successfully"}, 200
         except SQLAlchemyError as e:
@@ -116,7 +179,10 @@ class RolePermissionController:
                 return {"error": "Role-Permission relationship not found"}, 404
             
             db.session.delete(role_permission)
+            EffectivePermissionService.sync_role_permissions(role_permission.role_id, [role_permission.permission_id])
+            RBACVersion.bump('role_permissions')
             db.session.commit()
+            rbac_engine.mark_stale()
             
             return {"message": "Role-Permission relationship deleted successfully"}, 200
         except SQLAlchemyError as e:
@@ -1,8 +1,16 @@
+import hmac
 import uuid
 from datetime import datetime, timedelta
 from app.data.database import db
-from app.business.models.session import Session
 from app.business.models.user import User
+from app.business.models.device import Device
+from app.business.services.session_store import get_session_store, hash_token
+from app.business.services.session_validator import session_validator
+from app.business.services.revocation_list import revocation_list
+from app.business.services import signed_tokens
+from flask import current_app
+from app.business.services.session_reaper import session_reaper
+from app.business.services.session_stats import session_stats
 from sqlalchemy.exc import SQLAlchemyError
 
 class SessionController:
@@ -10,8 +18,7 @@ class SessionController:
     def get_all():
         """Get all sessions"""
         try:
-            sessions = Session.query.all()
-            return [session.to_dict() for session in sessions], 200
+            return get_session_store().all(), 200
         except SQLAlchemyError as e:
             return {"error": str(e)}, 500
 
@@ -19,10 +26,10 @@ class SessionController:
     def get_by_id(session_id):
         """Get a session by ID"""
         try:
-            session = Session.query.get(session_id)
+            session = get_session_store().get(session_id)
             if not session:
                 return {"error": "Session not found"}, 404
-            return session.to_dict(), 200
+            return session, 200
         except SQLAlchemyError as e:
             return {"error": str(e)}, 500
     
@@ -30,8 +37,24 @@ class SessionController:
     def get_by_user_id(user_id):
         """Get all sessions for a specific user"""
         try:
-            sessions = Session.query.filter_by(user_id=user_id).all()
-            return [session.to_dict() for session in sessions], 200
+            return get_session_store().for_user(user_id), 200
+        except SQLAlchemyError as e:
+            return {"error": str(e)}, 500
+
+    @staticmethod
+    def validate(data):
+        """Check that a token belongs to an active, unexpired session"""
+        try:
+            if not data or not data.get('token'):
+                return {"error": "token is required"}, 400
+            if not isinstance(data['token'], str):
+                return {"error": "token must be a string"}, 400
+
+            result, reason = session_validator.validate(data['token'])
+            if reason is not None:
+                return {"valid": False, "error": reason}, 401
+            result['valid'] = True
+            return result, 200
         except SQLAlchemyError as e:
             return {"error": str(e)}, 500
 
@@ -44,27 +67,33 @@ class SessionController:
             if not user:
                 return {"error": "User not found"}, 404
             
-            # Generate session token if not provided
-            token = data.get('token') or str(uuid.uuid4())
-            
             # Set default expiration to 24 hours from now if not provided
             expiration = data.get('expiration')
             if not expiration:
-                expiration = datetime.utcnow() + timedelta(hours=24)
-            expiration=datetime.strptime(expiration, "%Y-%m-%d %H:%M:%S")
-            new_session = Session(
-                id=str(uuid.uuid4()),
-                user_id=user_id,
-                token=token,
-                expiration=expiration,
-                FACode=data.get('FACode'),
-                state=data.get('state', 'active')
-            )
+                expiration = datetime.utcnow().replace(microsecond=0) + timedelta(hours=24)
+            else:
+                expiration = datetime.strptime(expiration, "%Y-%m-%d %H:%M:%S")
+
+            # Generate session token if not provided
+            session_id = str(uuid.uuid4())
+            token = data.get('token')
+            if not token and current_app.config['SESSION_TOKEN_MODE'] == 'signed':
+                token = signed_tokens.sign(user_id, session_id, expiration, current_app.config['SECRET_KEY'])
+            token = token or str(uuid.uuid4())
+            store = get_session_store()
+            if store.lookup(hash_token(token)):
+                return {"error": "Session token already in use"}, 400
             
-            db.session.add(new_session)
-            db.session.commit()
+            new_session = store.create(user_id, {
+                'token': token,
+                'expiration': expiration,
+                'FACode': data.get('FACode'),
+                'ip': data.get('ip'),
+                'state': data.get('state', 'active')
+            }, session_id=session_id)
+            revocation_list.track(hash_token(token), new_session['state'])
             
-            return new_session.to_dict(), 201
+            return new_session, 201
         except SQLAlchemyError as e:
             db.session.rollback()
             return {"error": str(e)}, 500
@@ -73,22 +102,41 @@ class SessionController:
     def update(session_id, data):
         """Update a session"""
         try:
-            session = Session.query.get(session_id)
+            store = get_session_store()
+            session = store.get(session_id)
             if not session:
                 return {"error": "Session not found"}, 404
             
+            fields = {}
             if 'token' in data:
-                session.token = data['token']
+                existing = store.lookup(hash_token(data['token']))
+                if existing and existing[0] != session_id:
+                    return {"error": "Session token already in use"}, 400
+                fields['token'] = data['token']
             if 'expiration' in data:
-                expiration = datetime.strptime(data['expiration'], "%Y-%m-%d %H:%M:%S")
-                session.expiration = expiration
+                fields['expiration'] = datetime.strptime(data['expiration'], "%Y-%m-%d %H:%M:%S")
+                # Signed tokens carry their expiry, so a new expiration needs a new token
+                if 'token' not in fields and signed_tokens.is_signed(session['token']) \
+                        and current_app.config['SESSION_TOKEN_MODE'] == 'signed':
+                    fields['token'] = signed_tokens.sign(
+                        session['user_id'], session_id, fields['expiration'], current_app.config['SECRET_KEY'])
             if 'FACode' in data:
-                session.FACode = data['FACode']
+                fields['FACode'] = data['FACode']
+            if 'ip' in data:
+                fields['ip'] = data['ip']
             if 'state' in data:
-                session.state = data['state']
+                fields['state'] = data['state']
                 
-            db.session.commit()
-            return session.to_dict(), 200
+            updated = store.update(session_id, fields)
+            if not updated:
+                return {"error": "Session not found"}, 404
+            old_token_hash, token_hash = hash_token(session['token']), hash_token(updated['token'])
+            session_validator.invalidate(old_token_hash, token_hash)
+            revocation_list.track(token_hash, updated['state'])
+            if old_token_hash != token_hash:
+                revocation_list.revoke([(old_token_hash, session['expiration'])])
+                db.session.commit()
+            return updated, 200
         except SQLAlchemyError as e:
             db.session.rollback()
             return {"error": str(e)}, 500
@@ -97,14 +145,93 @@ class SessionController:
     def delete(session_id):
         """Delete a session"""
         try:
-            session = Session.query.get(session_id)
-            if not session:
+            removed = get_session_store().delete(session_id)
+            if removed is None:
                 return {"error": "Session not found"}, 404
             
-            db.session.delete(session)
+            session_validator.invalidate(removed[0])
+            revocation_list.revoke([removed])
             db.session.commit()
             
             return {"message": "Session deleted successfully"}, 200
         except SQLAlchemyError as e:
             db.session.rollback()
-            return {"error": str(e)}, 500
\ No newline at end of file
+            return {"error": str(e)}, 500
+
+    @staticmethod
+    def verify_2fa(user_id, data):
+        """Check the 2FA code of one of the user's sessions"""
+        try:
+            if not data or not data.get('session_id') or not data.get('code'):
+                return {"error": "session_id and code are required"}, 400
+
+            session = get_session_store().get(data['session_id'])
+            if not session or session['user_id'] != user_id:
+                return {"error": "Session not found"}, 404
+            if session['state'] != 'active' or session['expiration'] <= datetime.utcnow():
+                return {"verified": False, "error": "Session is not active"}, 401
+            if not session['FACode'] or not hmac.compare_digest(str(session['FACode']), str(data['code'])):
+                return {"verified": False, "error": "Invalid code"}, 401
+            return {"verified": True, "session_id": session['id']}, 200
+        except SQLAlchemyError as e:
+            return {"error": str(e)}, 500
+
+    @staticmethod
+    def set_state(data):
+        """Change the state of every session matching a filter in one statement"""
+        try:
+            if not data or not data.get('state'):
+                return {"error": "state is required"}, 400
+            filters = {name: data.get(name) for name in ('user_id', 'ip') if data.get(name) is not None}
+            if data.get('expires_before'):
+                filters['expires_before'] = datetime.strptime(data['expires_before'], "%Y-%m-%d %H:%M:%S")
+            if data.get('device_id') is not None:
+                device = Device.query.get(data['device_id'])
+                if not device:
+                    return {"error": "Device not found"}, 404
+                filters.update(user_id=device.user_id, ip=device.ip)
+            if not filters:
+                return {"error": "At least one of user_id, ip, device_id or expires_before is required"}, 400
+            # from_state only narrows the selection, it never selects on its own
+            if data.get('from_state'):
+                filters['state'] = data['from_state']
+
+            changed = get_session_store().set_state(filters, data['state'])
+            token_hashes = [token_hash for token_hash, _ in changed]
+            session_validator.invalidate(*token_hashes)
+            if data['state'] == 'active':
+                revocation_list.discard(*token_hashes)
+            else:
+                revocation_list.add(*token_hashes)
+            return {"updated": len(changed), "state": data['state']}, 200
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            return {"error": str(e)}, 500
+
+    @staticmethod
+    def revoke_user_sessions(user_id):
+        """End all active sessions of a user"""
+        return SessionController.set_state({'user_id': user_id, 'from_state': 'active', 'state': 'revoked'})
+
+    @staticmethod
+    def get_stats():
+        """Get aggregated session counts"""
+        try:
+            return session_stats.get(), 200
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            return {"error": str(e)}, 500
+
+    @staticmethod
+    def get_reaper_metrics():
+        """Get the rows deleted and time spent by the session reaper"""
+        return session_reaper.get_metrics(), 200
+
+    @staticmethod
+    def reap():
+        """Delete expired and terminated sessions now"""
+        try:
+            return {"reaped": session_reaper.reap()}, 200
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            return {"error": str(e)}, 500
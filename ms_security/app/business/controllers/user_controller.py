@@ -1,5 +1,12 @@
 from app.data.database import db
 from app.business.models.user import User
+from app.business.models.rbac_version import RBACVersion
+from app.business.services.rbac_engine import rbac_engine
+from app.business.services.effective_permissions import EffectivePermissionService
+from app.business.services.session_store import get_session_store
+from app.business.services.session_validator import session_validator
+from app.business.services.revocation_list import revocation_list
+from app.business.services.blob_store import blob_store
 from sqlalchemy.exc import SQLAlchemyError
 
 
@@ -80,8 +87,19 @@ class UserController:
             if not user:
                 return {"error": "User not found"}, 404
                 
+            EffectivePermissionService.remove_user(user_id)
+            removed = get_session_store().delete_for_user(user_id)
+            revocation_list.revoke(removed)
+            # Profile and signature go with the user; so do their references to stored files
+            if user.profile:
+                blob_store.release(user.profile.photo)
+            if user.digital_signature:
+                blob_store.release(user.digital_signature.photo)
             db.session.delete(user)
+            RBACVersion.bump('user_roles')
             db.session.commit()
+            rbac_engine.mark_stale()
+            session_validator.invalidate(*(token_hash for token_hash, _ in removed))
             
             return {"message": "User deleted successfully"}, 200
         except SQLAlchemyError as e:
@@ -4,6 +4,9 @@ from app.data.database import db
 from app.business.models.user_role import UserRole
 from app.business.models.user import User
 from app.business.models.role import Role
+from app.business.models.rbac_version import RBACVersion
+from app.business.services.rbac_engine import rbac_engine
+from app.business.services.effective_permissions import EffectivePermissionService
 from sqlalchemy.exc import SQLAlchemyError
 
 class UserRoleController:
@@ -75,7 +78,7 @@ class UserRoleController:
             # Process optional data
             if data is None:
                 data = {}
-            startAt = datetime.strptime(data.get('endAt'), "%Y-%m-%d %H:%M:%S")
+            startAt = datetime.strptime(data.get('startAt'), "%Y-%m-%d %H:%M:%S")
             endAt = datetime.strptime(data.get('endAt'), "%Y-%m-%d %H:%M:%S")
             new_user_role = UserRole(
                 id=str(uuid.uuid4()),
@@ -86,7 +89,10 @@ class UserRoleController:
             )
             
             db.session.add(new_user_role)
+            EffectivePermissionService.sync_user_role(new_user_role.id)
+            RBACVersion.bump('user_roles')
             db.session.commit()
+            rbac_engine.mark_stale()
             
             return new_user_role.to_dict(), 201
         except SQLAlchemyError as e:
@@ -102,11 +108,14 @@ class UserRoleController:
                 return {"error": "User-Role relationship not found"}, 404
             
             if 'startAt' in data:
-                user_role.startAt = data['startAt']
+                user_role.startAt = datetime.strptime(data['startAt'], "%Y-%m-%d %H:%M:%S")
             if 'endAt' in data:
-                user_role.endAt = data['endAt']
+                user_role.endAt = datetime.strptime(data['endAt'], "%Y-%m-%d %H:%M:%S") if data['endAt'] else None
                 
+            EffectivePermissionService.update_window(user_role)
+            RBACVersion.bump('user_roles')
             db.session.commit()
+            rbac_engine.mark_stale()
             return user_role.to_dict(), 200
         except SQLAlchemyError as e:
             db.session.rollback()
@@ -120,8 +129,11 @@ class UserRoleController:
             if not user_role:
                 return {"error": "User-Role relationship not found"}, 404
             
+            EffectivePermissionService.remove_user_role(user_role_id)
             db.session.delete(user_role)
+            RBACVersion.bump('user_roles')
             db.session.commit()
+            rbac_engine.mark_stale()
             
             return {"message": "User-Role relationship deleted successfully"}, 200
         except SQLAlchemyError as e:
@@ -10,4 +10,9 @@ from app.business.models.answer import Answer
 from app.business.models.role import Role
 from app.business.models.permission import Permission
 from app.business.models.user_role import UserRole
-from app.business.models.role_permission import RolePermission
\ No newline at end of file
+from app.business.models.role_permission import RolePermission
+from app.business.models.rbac_version import RBACVersion
+from app.business.models.user_effective_permission import UserEffectivePermission
+from app.business.models.role_closure import RoleClosure
+from app.business.models.revoked_token import RevokedToken
+from app.business.models.blob import Blob
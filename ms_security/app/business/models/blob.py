@@ -0,0 +1,22 @@
+from app.data.database import db
+from datetime import datetime
+
+class Blob(db.Model):
+    __tablename__ = 'blobs'
+
+    # Uploaded files are stored once per folder under their SHA-256, and removed
+    # when the last profile or signature pointing at them lets go.
+    path = db.Column(db.String(255), primary_key=True)  # '<folder>/<sha256>'
+    sha256 = db.Column(db.String(64), nullable=False, index=True)
+    size = db.Column(db.Integer, nullable=False)
+    ref_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'path': self.path,
+            'sha256': self.sha256,
+            'size': self.size,
+            'ref_count': self.ref_count,
+            'created_at': self.created_at
+        }
@@ -6,6 +6,7 @@ class DigitalSignature(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     photo = db.Column(db.String(255))  # Path to the stored signature image
+    photo_hash = db.Column(db.String(64))  # SHA-256 of the photo, see Blob
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -18,6 +19,7 @@ class DigitalSignature(db.Model):
             'id': self.id,
             'user_id': self.user_id,
             'photo': self.photo,
+            'photo_hash': self.photo_hash,
             'created_at': self.created_at,
             'updated_at': self.updated_at
         }
\ No newline at end of file
@@ -3,11 +3,24 @@ from datetime import datetime
 
 class Password(db.Model):
     __tablename__ = 'passwords'
+    __table_args__ = (
+        # Current-password lookups: user_id, startAt <= now, endAt NULL or > now
+        db.Index('ix_passwords_user_current', 'user_id', 'startAt', 'endAt'),
+        # Open-ended rows only, where the database supports partial indexes
+        db.Index('ix_passwords_user_open', 'user_id', 'startAt',
+                 sqlite_where=db.text('"endAt" IS NULL'), postgresql_where=db.text('"endAt" IS NULL')),
+        # Expiry sweep: expired passwords not swept yet, in endAt order
+        db.Index('ix_passwords_unswept_end', 'endAt', 'id',
+                 sqlite_where=db.text('"expirySweptAt" IS NULL'),
+                 postgresql_where=db.text('"expirySweptAt" IS NULL')),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     content = db.Column(db.String(255), nullable=False)
     startAt = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     endAt = db.Column(db.DateTime)
+    # Set by the expiry sweep once it handled this password, cleared when endAt changes
+    expirySweptAt = db.Column(db.DateTime)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
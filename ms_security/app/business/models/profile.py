@@ -7,6 +7,7 @@ class Profile(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     phone = db.Column(db.String(20))
     photo = db.Column(db.String(255))  # Path to the stored photo
+    photo_hash = db.Column(db.String(64))  # SHA-256 of the photo, see Blob
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -20,6 +21,7 @@ class Profile(db.Model):
             'user_id': self.user_id,
             'phone': self.phone,
             'photo': self.photo,
+            'photo_hash': self.photo_hash,
             'created_at': self.created_at,
             'updated_at': self.updated_at
         }
\ No newline at end of file
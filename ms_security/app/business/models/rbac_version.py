@@ -0,0 +1,42 @@
+from app.data.database import db
+from datetime import datetime
+
+class RBACVersion(db.Model):
+    __tablename__ = 'rbac_versions'
+
+    # One generation counter per group of RBAC tables
+    SCOPES = ('roles', 'permissions', 'role_permissions', 'user_roles', 'role_hierarchy')
+
+    scope = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @staticmethod
+    def ensure_scopes():
+        """Create the counter rows that do not exist yet"""
+        existing = {scope for (scope,) in db.session.query(RBACVersion.scope)}
+        for scope in RBACVersion.SCOPES:
+            if scope not in existing:
+                db.session.add(RBACVersion(scope=scope, version=0))
+        db.session.commit()
+
+    @staticmethod
+    def bump(*scopes):
+        """Increment the counters of the given scopes in the current transaction"""
+        db.session.execute(
+            db.update(RBACVersion)
+            .where(RBACVersion.scope.in_(scopes))
+            .values(version=RBACVersion.version + 1, updated_at=datetime.utcnow())
+        )
+
+    @staticmethod
+    def current():
+        """Get the current counters as a dict of scope -> version"""
+        return {scope: version for scope, version in db.session.query(RBACVersion.scope, RBACVersion.version)}
+
+    def to_dict(self):
+        return {
+            'scope': self.scope,
+            'version': self.version,
+            'updated_at': self.updated_at
+        }
@@ -0,0 +1,18 @@
+from app.data.database import db
+from datetime import datetime
+
+class RevokedToken(db.Model):
+    __tablename__ = 'revoked_tokens'
+
+    # Signed session tokens verify without a lookup, so a token whose session was
+    # deleted or re-issued stays listed here until it would have expired anyway.
+    token_hash = db.Column(db.String(64), primary_key=True)
+    expiration = db.Column(db.DateTime, nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'token_hash': self.token_hash,
+            'expiration': self.expiration,
+            'created_at': self.created_at
+        }
@@ -0,0 +1,20 @@
+from app.data.database import db
+from datetime import datetime
+
+class RoleClosure(db.Model):
+    __tablename__ = 'role_closure'
+
+    # One row per (ancestor, descendant) pair of the role hierarchy, at any
+    # depth >= 1. A role's parent is its ancestor at depth 1.
+    ancestor_id = db.Column(db.Integer, db.ForeignKey('roles.id'), primary_key=True)
+    descendant_id = db.Column(db.Integer, db.ForeignKey('roles.id'), primary_key=True, index=True)
+    depth = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'ancestor_id': self.ancestor_id,
+            'descendant_id': self.descendant_id,
+            'depth': self.depth,
+            'created_at': self.created_at
+        }
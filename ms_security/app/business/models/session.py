@@ -6,9 +6,15 @@ class Session(db.Model):
     
     id = db.Column(db.String(36), primary_key=True)
     token = db.Column(db.String(255), nullable=False)
-    expiration = db.Column(db.DateTime, nullable=False)
+    # SHA-256 of the token, used to look sessions up by token
+    token_hash = db.Column(db.String(64), unique=True, index=True)
+    expiration = db.Column(db.DateTime, nullable=False, index=True)
     FACode = db.Column(db.String(10))
-    state = db.Column(db.String(20), nullable=False)
+    # Address the session was opened from, used to end sessions by device or IP
+    ip = db.Column(db.String(45), index=True)
+    state = db.Column(db.String(20), nullable=False, index=True)
+    # Last authenticated use, written in batches (see ActivityTracker)
+    last_activity_at = db.Column(db.DateTime)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -23,7 +29,9 @@ class Session(db.Model):
             'token': self.token,
             'expiration': self.expiration,
             'FACode': self.FACode,
+            'ip': self.ip,
             'state': self.state,
+            'last_activity_at': self.last_activity_at,
             'created_at': self.created_at,
             'updated_at': self.updated_at
         }
\ No newline at end of file
@@ -0,0 +1,40 @@
+from app.data.database import db
+from datetime import datetime
+
+class UserEffectivePermission(db.Model):
+    __tablename__ = 'user_effective_permissions'
+    __table_args__ = (
+        db.UniqueConstraint('user_role_id', 'permission_id', name='uq_uep_user_role_permission'),
+        # "Can user X do Y" is a probe on this index
+        db.Index('ix_uep_user_permission_active', 'user_id', 'permission_id', 'active'),
+        # Used by the scheduler to find rows crossing their time window
+        db.Index('ix_uep_active_start', 'active', 'startAt'),
+        db.Index('ix_uep_active_end', 'active', 'endAt'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    startAt = db.Column(db.DateTime, nullable=False)
+    endAt = db.Column(db.DateTime)
+    active = db.Column(db.Boolean, nullable=False, default=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Denormalized copy of UserRole x RolePermission
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    permission_id = db.Column(db.Integer, db.ForeignKey('permissions.id'), nullable=False, index=True)
+    role_id = db.Column(db.Integer, db.ForeignKey('roles.id'), nullable=False, index=True)
+    user_role_id = db.Column(db.String(36), db.ForeignKey('user_roles.id'), nullable=False)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'permission_id': self.permission_id,
+            'role_id': self.role_id,
+            'user_role_id': self.user_role_id,
+            'startAt': self.startAt,
+            'endAt': self.endAt,
+            'active': self.active,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
+        }
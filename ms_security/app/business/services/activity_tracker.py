@@ -0,0 +1,54 @@
+import threading
+from datetime import datetime
+from app.business.services.session_store import get_session_store
+
+
+class ActivityTracker:
+    """Collects session last-seen times in memory and writes them in batches.
+
+    ``touch`` only updates a dict. ``flush`` swaps the dict out and hands all
+    pending timestamps to the session store at once (one ``executemany``
+    UPDATE with the SQL store), so a session used on every request costs one
+    write per flush interval instead of one per request.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}  # session_id -> last seen
+        self.flushes = 0
+        self.flushed = 0
+
+    def touch(self, session_id, now=None):
+        now = now or datetime.utcnow()
+        with self._lock:
+            if self._pending.get(session_id, now) <= now:
+                self._pending[session_id] = now
+
+    def last_seen(self, session_id):
+        """Last activity seen by this worker and not flushed yet, or None"""
+        return self._pending.get(session_id)
+
+    def flush(self):
+        """Write pending timestamps and return how many sessions were updated"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        try:
+            get_session_store().record_activity(pending)
+        except Exception:
+            # Keep the timestamps for the next flush unless newer ones arrived
+            with self._lock:
+                for session_id, seen_at in pending.items():
+                    if self._pending.get(session_id, seen_at) <= seen_at:
+                        self._pending[session_id] = seen_at
+            raise
+        self.flushes += 1
+        self.flushed += len(pending)
+        return len(pending)
+
+    def stats(self):
+        return {'pending': len(self._pending), 'flushes': self.flushes, 'flushed': self.flushed}
+
+
+activity_tracker = ActivityTracker()
@@ -0,0 +1,117 @@
+import hashlib
+import os
+import tempfile
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session as SASession
+from app.data.database import db
+from app.business.models.blob import Blob
+
+# Key of db.session.info holding files to delete once the session commits
+_ORPHANS = 'orphaned_blobs'
+
+
+class BlobStore:
+    """Content-addressed storage for uploaded files.
+
+    An upload is streamed to a temporary file in chunks while its SHA-256 is
+    computed, then moved to ``<folder>/<sha256>`` under ``UPLOAD_FOLDER``.
+    The ``blobs`` table counts the records pointing at each file. Table
+    changes are staged and the caller commits; a file whose count reached
+    zero is deleted only after that commit, and only if no upload has
+    referenced it again, so neither a rollback nor a concurrent upload of the
+    same content leaves a record pointing at a missing file.
+    """
+
+    @staticmethod
+    def _full_path(path):
+        return os.path.join(current_app.config['UPLOAD_FOLDER'], path)
+
+    def store(self, upload, folder):
+        """Save a werkzeug ``FileStorage`` and return ``(path, sha256)``"""
+        directory = self._full_path(folder)
+        os.makedirs(directory, exist_ok=True)
+        chunk_size = current_app.config['UPLOAD_CHUNK_SIZE']
+        digest = hashlib.sha256()
+        size = 0
+        with tempfile.NamedTemporaryFile(dir=directory, prefix='.upload-', delete=False) as f:
+            try:
+                for chunk in iter(lambda: upload.stream.read(chunk_size), b''):
+                    digest.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+            except BaseException:
+                f.close()
+                os.remove(f.name)
+                raise
+        sha256 = digest.hexdigest()
+        path = f"{folder}/{sha256}"
+        try:
+            # Count the reference before the file appears, so a concurrent
+            # release of the same content sees the row (see _remove_orphans)
+            self._add_reference(path, sha256, size)
+            # Same name, same bytes: replacing an existing copy is harmless and atomic
+            os.replace(f.name, self._full_path(path))
+        except BaseException:
+            os.remove(f.name)
+            raise
+        return path, sha256
+
+    @staticmethod
+    def _add_reference(path, sha256, size):
+        """Insert the blob row or count one more reference, without racing concurrent uploads"""
+        values = dict(path=path, sha256=sha256, size=size, ref_count=1, created_at=datetime.utcnow())
+        dialect = db.session.get_bind().dialect.name
+        if dialect in ('sqlite', 'postgresql'):
+            insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+            db.session.execute(insert(Blob).values(**values).on_conflict_do_update(
+                index_elements=[Blob.path], set_={'ref_count': Blob.ref_count + 1}
+            ))
+            return
+        updated = db.session.execute(
+            db.update(Blob).where(Blob.path == path).values(ref_count=Blob.ref_count + 1)
+        ).rowcount
+        if not updated:
+            db.session.add(Blob(**values))
+
+    def release(self, path):
+        """Drop one reference to ``path``; the file goes after the last one, on commit"""
+        if not path:
+            return
+        updated = db.session.execute(
+            db.update(Blob).where(Blob.path == path).values(ref_count=Blob.ref_count - 1)
+        ).rowcount
+        if updated:
+            orphaned = db.session.execute(
+                db.delete(Blob).where(Blob.path == path, Blob.ref_count <= 0)
+            ).rowcount
+            if not orphaned:
+                return
+        # Files saved before blobs were tracked have no row and a single owner
+        db.session.info.setdefault(_ORPHANS, set()).add((path, self._full_path(path)))
+
+
+@event.listens_for(SASession, 'after_commit')
+def _remove_orphans(session):
+    orphans = session.info.pop(_ORPHANS, None)
+    if not orphans:
+        return
+    with session.get_bind().begin() as connection:
+        for path, full_path in orphans:
+            # The same content may have been uploaded again since the release.
+            # The no-op update takes the write lock, so an upload that already
+            # counted its reference is committed (and its row seen) first.
+            connection.execute(db.update(Blob).where(Blob.path == path).values(ref_count=Blob.ref_count))
+            if connection.execute(db.select(Blob.path).where(Blob.path == path)).first() is None \
+                    and os.path.exists(full_path):
+                os.remove(full_path)
+
+
+@event.listens_for(SASession, 'after_rollback')
+def _keep_orphans(session):
+    session.info.pop(_ORPHANS, None)
+
+
+blob_store = BlobStore()
@@ -0,0 +1,129 @@
+import hashlib
+import math
+import mmap
+import os
+import struct
+from flask import current_app
+
+HASH_LENGTH = 40  # hex digits of a SHA-1 digest
+_BLOOM_HEADER = struct.Struct('<QI')  # bit count, hash count
+
+
+def sha1_hex(password):
+    return hashlib.sha1(password.encode('utf-8')).hexdigest().upper()
+
+
+class BloomFilter:
+    """Bit array answering "definitely absent" for SHA-1 digests.
+
+    The digests are already uniformly distributed, so the bit positions are
+    taken from them by double hashing instead of hashing again.
+    """
+
+    def __init__(self, size_bits, hashes, bits=None):
+        self.size_bits = size_bits
+        self.hashes = hashes
+        self.bits = bits if bits is not None else bytearray((size_bits + 7) // 8)
+
+    @classmethod
+    def for_entries(cls, entries, bits_per_entry):
+        size_bits = max(8, entries * bits_per_entry)
+        return cls(size_bits, max(1, round(bits_per_entry * math.log(2))))
+
+    def _positions(self, digest):
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:16], 'little') | 1
+        return ((h1 + i * h2) % self.size_bits for i in range(self.hashes))
+
+    def add(self, digest):
+        for position in self._positions(digest):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, digest):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(digest))
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(_BLOOM_HEADER.pack(self.size_bits, self.hashes))
+            f.write(self.bits)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            size_bits, hashes = _BLOOM_HEADER.unpack(f.read(_BLOOM_HEADER.size))
+            return cls(size_bits, hashes, bytearray(f.read()))
+
+
+class BreachedPasswordList:
+    """Sorted list of breached SHA-1 hashes, searched in place through ``mmap``.
+
+    The file has one uppercase hex digest per line, optionally followed by
+    ``:count`` (the "ordered by hash" download of Have I Been Pwned). Only
+    the pages touched by a binary search are read, about 30 lines for a
+    billion entries, so the list is never loaded into memory. A Bloom filter,
+    when given, answers most lookups of passwords that are not in the list
+    without touching the file.
+    """
+
+    def __init__(self, path, bloom=None):
+        self.path = path
+        self.bloom = bloom
+        self._file = open(path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        self._size = size
+
+    def contains(self, digest_hex):
+        """Whether the uppercase hex SHA-1 ``digest_hex`` is in the list"""
+        if self.bloom is not None and bytes.fromhex(digest_hex) not in self.bloom:
+            return False
+        target = digest_hex.encode('ascii')
+        data = self._map
+        low, high = 0, self._size
+        while low < high:
+            middle = (low + high) // 2
+            start = data.rfind(b'\n', 0, middle) + 1
+            key = data[start:start + HASH_LENGTH]
+            if key == target:
+                return True
+            if key < target:
+                end = data.find(b'\n', middle)
+                low = end + 1 if end != -1 else self._size
+            else:
+                high = start
+        return False
+
+    def is_breached(self, password):
+        return self.contains(sha1_hex(password))
+
+    def close(self):
+        if self._size:
+            self._map.close()
+        self._file.close()
+
+
+def build_bloom(list_path, bits_per_entry):
+    """Bloom filter holding every digest of the list at ``list_path``"""
+    with open(list_path, 'rb') as f:
+        entries = sum(1 for line in f if line.strip())
+    bloom = BloomFilter.for_entries(entries, bits_per_entry)
+    with open(list_path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                bloom.add(bytes.fromhex(line[:HASH_LENGTH].decode('ascii')))
+    return bloom
+
+
+def open_breached_passwords(config):
+    """List configured by PASSWORD_BREACH_LIST_PATH, or None when the check is disabled"""
+    path = config['PASSWORD_BREACH_LIST_PATH']
+    if not path:
+        return None
+    bloom_path = config['PASSWORD_BREACH_BLOOM_PATH']
+    bloom = BloomFilter.load(bloom_path) if bloom_path and os.path.exists(bloom_path) else None
+    return BreachedPasswordList(path, bloom)
+
+
+def get_breached_passwords():
+    """Breached password list of the current application, or None"""
+    return current_app.extensions['breached_passwords']
@@ -0,0 +1,183 @@
+from datetime import datetime
+from app.data.database import db
+from app.business.models.permission import Permission
+from app.business.models.role_permission import RolePermission
+from app.business.models.user_role import UserRole
+from app.business.models.user_effective_permission import UserEffectivePermission
+from app.business.models.role_closure import RoleClosure
+from app.business.services.role_hierarchy import RoleHierarchyService
+
+UEP = UserEffectivePermission
+
+
+def _is_active(start_at, end_at, now):
+    """SQL expression that is true while ``now`` is inside [start_at, end_at)"""
+    return db.case(
+        (db.and_(start_at <= now, db.or_(end_at.is_(None), end_at > now)), True),
+        else_=False
+    )
+
+
+class EffectivePermissionService:
+    """Maintains the materialized ``user_effective_permissions`` table.
+
+    Every row is one permission a user gets through one UserRole, copied with
+    the assignment's time window and an ``active`` flag. Methods only stage
+    statements in the current transaction; callers commit.
+    """
+
+    @staticmethod
+    def _role_grants():
+        """(role_id, permission_id) pairs granted to each role, directly or inherited"""
+        direct = db.select(
+            RolePermission.role_id.label('role_id'),
+            RolePermission.permission_id.label('permission_id')
+        )
+        inherited = db.select(
+            RoleClosure.descendant_id.label('role_id'),
+            RolePermission.permission_id.label('permission_id')
+        ).join(RolePermission, RolePermission.role_id == RoleClosure.ancestor_id)
+        return db.union(direct, inherited).subquery()
+
+    @staticmethod
+    def _insert_from_user_roles(*conditions, permission_ids=None):
+        """Copy UserRole x role grants matching ``conditions`` into the table"""
+        now = datetime.utcnow()
+        grants = EffectivePermissionService._role_grants()
+        if permission_ids is not None:
+            conditions += (grants.c.permission_id.in_(permission_ids),)
+        existing = db.select(UEP.id).where(
+            UEP.user_role_id == UserRole.id,
+            UEP.permission_id == grants.c.permission_id
+        )
+        conditions += (~existing.exists(),)
+        select = db.select(
+            UserRole.user_id,
+            grants.c.permission_id,
+            UserRole.role_id,
+            UserRole.id,
+            UserRole.startAt,
+            UserRole.endAt,
+            _is_active(UserRole.startAt, UserRole.endAt, now)
+        ).join(grants, grants.c.role_id == UserRole.role_id).where(*conditions)
+        db.session.execute(
+            db.insert(UEP).from_select(
+                ['user_id', 'permission_id', 'role_id', 'user_role_id', 'startAt', 'endAt', 'active'],
+                select
+            )
+        )
+
+    @staticmethod
+    def sync_user_role(user_role_id):
+        """Recompute the rows of a single UserRole"""
+        db.session.flush()
+        db.session.execute(db.delete(UEP).where(UEP.user_role_id == user_role_id))
+        EffectivePermissionService._insert_from_user_roles(UserRole.id == user_role_id)
+
+    @staticmethod
+    def update_window(user_role):
+        """Copy a UserRole's new time window onto its rows"""
+        now = datetime.utcnow()
+        db.session.execute(
+            db.update(UEP)
+            .where(UEP.user_role_id == user_role.id)
+            .values(
+                startAt=user_role.startAt,
+                endAt=user_role.endAt,
+                active=(user_role.startAt <= now and (user_role.endAt is None or user_role.endAt > now))
+            )
+        )
+
+    @staticmethod
+    def sync_role_permissions(role_id, permission_ids):
+        """Recompute given permissions for holders of a role and of roles inheriting from it.
+
+        Call it after the RolePermission rows were added or removed.
+        """
+        if not permission_ids:
+            return
+        db.session.flush()
+        role_ids = [descendant_id for descendant_id, _ in RoleHierarchyService.subtree(role_id)]
+        db.session.execute(
+            db.delete(UEP).where(UEP.role_id.in_(role_ids), UEP.permission_id.in_(permission_ids))
+        )
+        EffectivePermissionService._insert_from_user_roles(
+            UserRole.role_id.in_(role_ids),
+            permission_ids=permission_ids
+        )
+
+    @staticmethod
+    def sync_roles(role_ids):
+        """Recompute all rows of holders of the given roles, e.g. after a hierarchy change"""
+        if not role_ids:
+            return
+        db.session.flush()
+        db.session.execute(db.delete(UEP).where(UEP.role_id.in_(role_ids)))
+        EffectivePermissionService._insert_from_user_roles(UserRole.role_id.in_(role_ids))
+
+    @staticmethod
+    def remove_user_role(user_role_id):
+        db.session.execute(db.delete(UEP).where(UEP.user_role_id == user_role_id))
+
+    @staticmethod
+    def remove_role(role_id):
+        db.session.execute(db.delete(UEP).where(UEP.role_id == role_id))
+
+    @staticmethod
+    def remove_permission(permission_id):
+        db.session.execute(db.delete(UEP).where(UEP.permission_id == permission_id))
+
+    @staticmethod
+    def remove_user(user_id):
+        db.session.execute(db.delete(UEP).where(UEP.user_id == user_id))
+
+    @staticmethod
+    def rebuild():
+        """Recompute the whole table from UserRole and RolePermission"""
+        db.session.execute(db.delete(UEP))
+        EffectivePermissionService._insert_from_user_roles()
+        db.session.commit()
+
+    @staticmethod
+    def rebuild_if_empty():
+        """Populate the table on first start against an existing database"""
+        if db.session.query(UEP.id).first() is None and db.session.query(UserRole.id).first() is not None:
+            EffectivePermissionService.rebuild()
+
+    @staticmethod
+    def refresh_windows(now=None):
+        """Activate and expire rows whose startAt/endAt boundary has passed.
+
+        Returns the number of rows activated and expired.
+        """
+        now = now or datetime.utcnow()
+        activated = db.session.execute(
+            db.update(UEP)
+            .where(UEP.active == False, UEP.startAt <= now, db.or_(UEP.endAt.is_(None), UEP.endAt > now))
+            .values(active=True)
+        ).rowcount
+        expired = db.session.execute(
+            db.update(UEP)
+            .where(UEP.active == True, db.or_(UEP.startAt > now, UEP.endAt <= now))
+            .values(active=False)
+        ).rowcount
+        db.session.commit()
+        return {'activated': activated, 'expired': expired}
+
+    @staticmethod
+    def has_permission(user_id, permission_id):
+        """Single index probe: does the user currently hold the permission?"""
+        return db.session.query(
+            db.session.query(UEP.id)
+            .filter_by(user_id=user_id, permission_id=permission_id, active=True)
+            .exists()
+        ).scalar()
+
+    @staticmethod
+    def get_for_user(user_id):
+        """Permissions the user currently holds"""
+        return db.session.query(Permission)\
+            .join(UEP, UEP.permission_id == Permission.id)\
+            .filter(UEP.user_id == user_id, UEP.active == True)\
+            .distinct()\
+            .all()
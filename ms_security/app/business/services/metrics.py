@@ -0,0 +1,56 @@
+import threading
+
+# Upper bounds, in microseconds, of the latency histogram buckets
+LATENCY_BUCKETS_US = (10, 50, 100, 500, 1000, 5000, 10000, 50000)
+
+
+class Metrics:
+    """Thread-safe counters and latency histograms kept in process memory"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._timings = {}
+
+    def incr(self, name, value=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name, seconds):
+        """Record one duration, in seconds, under ``name``"""
+        micros = seconds * 1e6
+        with self._lock:
+            timing = self._timings.get(name)
+            if timing is None:
+                timing = self._timings[name] = {
+                    'count': 0, 'total_us': 0.0, 'max_us': 0.0,
+                    'buckets': [0] * (len(LATENCY_BUCKETS_US) + 1)
+                }
+            timing['count'] += 1
+            timing['total_us'] += micros
+            timing['max_us'] = max(timing['max_us'], micros)
+            index = len(LATENCY_BUCKETS_US)
+            for i, bound in enumerate(LATENCY_BUCKETS_US):
+                if micros <= bound:
+                    index = i
+                    break
+            timing['buckets'][index] += 1
+
+    def snapshot(self):
+        with self._lock:
+            timings = {}
+            for name, timing in self._timings.items():
+                labels = [f"<={bound}us" for bound in LATENCY_BUCKETS_US] + [f">{LATENCY_BUCKETS_US[-1]}us"]
+                timings[name] = {
+                    'count': timing['count'],
+                    'avg_us': timing['total_us'] / timing['count'] if timing['count'] else 0.0,
+                    'max_us': timing['max_us'],
+                    'total_us': timing['total_us'],
+                    'histogram': dict(zip(labels, timing['buckets']))
+                }
+            return {'counters': dict(self._counters), 'timings': timings}
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
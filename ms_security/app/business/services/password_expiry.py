@@ -0,0 +1,80 @@
+import time
+from datetime import datetime
+from flask import current_app
+from app.data.database import db
+from app.business.models.password import Password
+from app.business.services.metrics import Metrics
+from app.business.services.revocation_list import revocation_list
+from app.business.services.session_store import get_session_store
+from app.business.services.session_validator import session_validator
+
+
+class PasswordExpirySweep:
+    """Moves the active sessions of users whose password expired to ``password_expired``.
+
+    Passwords whose ``endAt`` has passed and that have not been swept yet
+    are read through a partial index, ``PASSWORD_EXPIRY_SWEEP_BATCH_SIZE`` at
+    a time, and marked with ``expirySweptAt`` once handled. Changing ``endAt``
+    clears the mark, so a backdated password is swept on the next run. Users
+    who already have another current password are skipped; the sessions of
+    the others are updated with one statement per batch.
+    """
+
+    EXPIRED_STATE = 'password_expired'
+
+    def __init__(self):
+        self.metrics = Metrics()
+
+    def sweep(self, now=None):
+        """Run one pass and return the number of expired passwords read and sessions flagged"""
+        config = current_app.config
+        batch_size = config['PASSWORD_EXPIRY_SWEEP_BATCH_SIZE']
+        now = now or datetime.utcnow()
+        started = time.perf_counter()
+        passwords = sessions = 0
+        while True:
+            rows = db.session.query(Password.id, Password.user_id)\
+                .filter(Password.expirySweptAt.is_(None), Password.endAt <= now)\
+                .order_by(Password.endAt, Password.id)\
+                .limit(batch_size)\
+                .all()
+            if not rows:
+                break
+
+            user_ids = {row.user_id for row in rows}
+            renewed = {
+                user_id for (user_id,) in db.session.query(Password.user_id).filter(
+                    Password.user_id.in_(user_ids),
+                    Password.startAt <= now,
+                    db.or_(Password.endAt.is_(None), Password.endAt > now)
+                ).distinct()
+            }
+            expired = sorted(user_ids - renewed)
+            db.session.rollback()
+            if expired:
+                changed = get_session_store().set_state({'user_ids': expired, 'state': 'active'}, self.EXPIRED_STATE)
+                token_hashes = [token_hash for token_hash, _ in changed]
+                session_validator.invalidate(*token_hashes)
+                revocation_list.add(*token_hashes)
+                sessions += len(changed)
+
+            # Marked after the sessions changed, so an interrupted batch is redone
+            db.session.execute(
+                db.update(Password).where(Password.id.in_([row.id for row in rows]))
+                .values(expirySweptAt=now, updated_at=Password.updated_at)
+            )
+            db.session.commit()
+            passwords += len(rows)
+            if len(rows) < batch_size:
+                break
+        self.metrics.incr('runs')
+        self.metrics.incr('passwords', passwords)
+        self.metrics.incr('sessions', sessions)
+        self.metrics.observe('run', time.perf_counter() - started)
+        return {'passwords': passwords, 'sessions': sessions}
+
+    def get_metrics(self):
+        return self.metrics.snapshot()
+
+
+password_expiry_sweep = PasswordExpirySweep()
@@ -0,0 +1,216 @@
+import atexit
+import hashlib
+import multiprocessing
+import os
+import secrets
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class HashingBusyError(Exception):
+    """The hashing pool is saturated or did not answer within the latency budget"""
+
+
+def calibrate(target_seconds, min_iterations, sample_iterations=50000, rounds=3):
+    """Pick a PBKDF2-SHA256 ``method`` string whose hash takes about ``target_seconds`` here.
+
+    Times a few short runs, scales the iteration count linearly and never
+    goes below ``min_iterations``.
+    """
+    best = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        hashlib.pbkdf2_hmac('sha256', b'calibration', b'calibration-salt', sample_iterations)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    iterations = int(sample_iterations * target_seconds / best) // 10000 * 10000
+    return f"pbkdf2:sha256:{max(min_iterations, iterations)}"
+
+
+def calibrated_method(path, target_seconds, min_iterations):
+    """``calibrate()`` once per host: the result is stored at ``path`` and reused.
+
+    Every worker and restart reads the same value, so they agree on the cost
+    of new hashes. Delete the file to measure again.
+    """
+    try:
+        with open(path) as f:
+            method = f.read().strip()
+        if method:
+            return method
+    except FileNotFoundError:
+        pass
+    method = calibrate(target_seconds, min_iterations)
+    directory = os.path.dirname(os.path.abspath(path))
+    with tempfile.NamedTemporaryFile('w', dir=directory, delete=False) as f:
+        f.write(method + '\n')
+    try:
+        # Publish the complete file, unless another worker got there first
+        os.link(f.name, path)
+    except FileExistsError:
+        with open(path) as existing:
+            method = existing.read().strip() or method
+    finally:
+        os.remove(f.name)
+    return method
+
+
+def _pbkdf2_cost(method):
+    """``(digest, iterations)`` of a ``pbkdf2:<digest>:<iterations>`` method, else None"""
+    parts = method.split(':')
+    if len(parts) == 3 and parts[0] == 'pbkdf2' and parts[2].isdigit():
+        return parts[1], int(parts[2])
+    return None
+
+
+def needs_rehash(password_hash, method):
+    """Whether a stored hash is weaker than ``method``.
+
+    A PBKDF2 hash with the same digest and at least as many iterations is
+    current; any other method must match exactly.
+    """
+    if not method:
+        return False
+    stored = password_hash.split('$', 1)[0]
+    if stored == method:
+        return False
+    wanted, current = _pbkdf2_cost(method), _pbkdf2_cost(stored)
+    if wanted is None or current is None:
+        return True
+    return current[0] != wanted[0] or current[1] < wanted[1]
+
+
+def _mp_context():
+    # Forking after the scheduler threads started could copy a held lock into
+    # the child, so workers come from a clean forkserver (or spawn) process
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+class PasswordHasher:
+    """Runs password KDF work in a bounded process pool.
+
+    Hashing is CPU-bound and holds the GIL, so running it in request threads
+    stalls every other request of the worker. Here it runs in
+    ``PASSWORD_HASH_WORKERS`` child processes. At most
+    ``PASSWORD_HASH_MAX_PENDING`` jobs may be queued or running; callers
+    wait up to ``PASSWORD_HASH_QUEUE_TIMEOUT`` seconds for a slot and up to
+    ``PASSWORD_HASH_TIMEOUT`` seconds for the result, then get
+    ``HashingBusyError``. With 0 workers everything runs inline.
+
+    If a child dies (e.g. killed for memory), the pool breaks: the calls
+    using it get ``HashingBusyError`` and the next one starts a new pool.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._slots = None
+        self._dummy_hashes = {}  # method -> hash of a random password
+        atexit.register(self.shutdown)
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                config = current_app.config
+                self._executor = ProcessPoolExecutor(max_workers=config['PASSWORD_HASH_WORKERS'],
+                                                     mp_context=_mp_context())
+                self._slots = threading.BoundedSemaphore(config['PASSWORD_HASH_MAX_PENDING'])
+            return self._executor, self._slots
+
+    def _broken(self, executor):
+        """Drop a broken pool so the next call starts a new one"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+        return HashingBusyError("Password hashing is unavailable, try again later")
+
+    def _submit(self, func, *args):
+        """Queue ``func(*args)`` once a slot is free; returns the pool and the future"""
+        executor, slots = self._pool()
+        if not slots.acquire(timeout=current_app.config['PASSWORD_HASH_QUEUE_TIMEOUT']):
+            raise HashingBusyError("Password hashing is busy, try again later")
+        try:
+            future = executor.submit(func, *args)
+        except BrokenProcessPool:
+            slots.release()
+            raise self._broken(executor)
+        except Exception:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+        return executor, future
+
+    def submit(self, func, *args):
+        """Run ``func(*args)`` in the pool and wait for its result"""
+        if not current_app.config['PASSWORD_HASH_WORKERS']:
+            return func(*args)
+        executor, future = self._submit(func, *args)
+        try:
+            return future.result(timeout=current_app.config['PASSWORD_HASH_TIMEOUT'])
+        except TimeoutError:
+            raise HashingBusyError("Password hashing timed out, try again later")
+        except BrokenProcessPool:
+            raise self._broken(executor)
+
+    def hash(self, password):
+        method = current_app.config['PASSWORD_HASH_METHOD']
+        if method:
+            return self.submit(generate_password_hash, password, method)
+        return self.submit(generate_password_hash, password)
+
+    def verify(self, password_hash, password):
+        return self.submit(check_password_hash, password_hash, password)
+
+    def dummy_hash(self):
+        """Hash of a random password with the current method.
+
+        Verifying against it costs as much as a real check, so a missing
+        account answers as slowly as a wrong password.
+        """
+        method = current_app.config['PASSWORD_HASH_METHOD']
+        dummy = self._dummy_hashes.get(method)
+        if dummy is None:
+            dummy = self._dummy_hashes[method] = self.hash(secrets.token_hex(16))
+        return dummy
+
+    def matches_any(self, password, password_hashes):
+        """Whether ``password`` matches any of the hashes.
+
+        The checks run in parallel and the first match cancels the ones that
+        have not started yet.
+        """
+        if not current_app.config['PASSWORD_HASH_WORKERS']:
+            return any(check_password_hash(password_hash, password) for password_hash in password_hashes)
+        futures = []
+        executor = None
+        try:
+            for password_hash in password_hashes:
+                executor, future = self._submit(check_password_hash, password_hash, password)
+                futures.append(future)
+            for future in as_completed(futures, timeout=current_app.config['PASSWORD_HASH_TIMEOUT']):
+                if future.result():
+                    return True
+            return False
+        except TimeoutError:
+            raise HashingBusyError("Password hashing timed out, try again later")
+        except BrokenProcessPool:
+            raise self._broken(executor)
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,41 @@
+from flask import current_app
+from app.business.services.lru_cache import LRUCache
+from app.business.services.metrics import Metrics
+from app.business.services.rbac_engine import rbac_engine
+from app.business.services.session_validator import session_validator
+
+authorization_metrics = Metrics()
+
+# (user_id, url rule, method) -> (engine generation, permission_id, allowed)
+_decision_cache = LRUCache(maxsize=50000)
+
+
+def resolve_user_id(token):
+    """User owning an active, unexpired session with this token, or None"""
+    return session_validator.user_id_for(token)
+
+
+def decide(user_id, rule, method):
+    """Return (permission_id, allowed) for a URL rule, using the decision cache"""
+    generation = rbac_engine.current_generation()
+    key = (user_id, rule, method)
+    cached = _decision_cache.get(key)
+    if cached is not None and cached[0] == generation:
+        authorization_metrics.incr('cache_hits')
+        return cached[1], cached[2]
+
+    authorization_metrics.incr('cache_misses')
+    permission_id = rbac_engine.resolve_rule(rule, method)
+    allowed = permission_id is not None and rbac_engine.check(user_id, permission_id)
+    # Decisions depend on UserRole time windows too, so they also expire
+    _decision_cache.put(key, (generation, permission_id, allowed), ttl=current_app.config['RBAC_DECISION_CACHE_TTL'])
+    return permission_id, allowed
+
+
+def get_metrics():
+    """Counters, check latency and cache sizes of the enforcement layer"""
+    snapshot = authorization_metrics.snapshot()
+    snapshot['decision_cache'] = _decision_cache.stats()
+    snapshot['session_cache'] = session_validator.stats()
+    snapshot['rbac_generation'] = rbac_engine.generation
+    return snapshot
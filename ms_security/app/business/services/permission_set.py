@@ -0,0 +1,84 @@
+import base64
+
+
+class PermissionSet:
+    """Compact set of permission ids stored as the bits of a Python int.
+
+    Bit ``n`` is set when the set contains ``Permission.id == n``. Union,
+    difference and membership are single integer operations, and a set
+    serializes to a few bytes regardless of how many ids it holds.
+    """
+
+    __slots__ = ('bits',)
+
+    def __init__(self, bits=0):
+        self.bits = bits
+
+    @classmethod
+    def from_ids(cls, permission_ids):
+        bits = 0
+        for permission_id in permission_ids:
+            bits |= 1 << permission_id
+        return cls(bits)
+
+    def has(self, permission_id):
+        return permission_id is not None and permission_id >= 0 and bool((self.bits >> permission_id) & 1)
+
+    def union(self, other):
+        return PermissionSet(self.bits | other.bits)
+
+    def diff(self, other):
+        """Ids in this set that are not in ``other``"""
+        return PermissionSet(self.bits & ~other.bits)
+
+    def intersection(self, other):
+        return PermissionSet(self.bits & other.bits)
+
+    def ids(self):
+        """Yield the permission ids in ascending order"""
+        bits = self.bits
+        while bits:
+            lowest = bits & -bits
+            yield lowest.bit_length() - 1
+            bits ^= lowest
+
+    def to_bytes(self):
+        return self.bits.to_bytes((self.bits.bit_length() + 7) // 8, 'little')
+
+    @classmethod
+    def from_bytes(cls, data):
+        return cls(int.from_bytes(data, 'little'))
+
+    def serialize(self):
+        """URL-safe base64 of the little-endian bitmap"""
+        return base64.urlsafe_b64encode(self.to_bytes()).decode('ascii')
+
+    @classmethod
+    def deserialize(cls, value):
+        return cls.from_bytes(base64.urlsafe_b64decode(value.encode('ascii')))
+
+    __contains__ = has
+    __or__ = union
+    __sub__ = diff
+    __and__ = intersection
+
+    def __iter__(self):
+        return self.ids()
+
+    def __len__(self):
+        return bin(self.bits).count('1')
+
+    def __bool__(self):
+        return self.bits != 0
+
+    def __eq__(self, other):
+        return isinstance(other, PermissionSet) and self.bits == other.bits
+
+    def __hash__(self):
+        return hash(self.bits)
+
+    def __repr__(self):
+        return f"PermissionSet({list(self.ids())})"
+
+
+EMPTY = PermissionSet()
@@ -0,0 +1,152 @@
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+
+def _refill(tokens, updated_at, now, rate, burst):
+    return min(burst, tokens + (now - updated_at) * rate)
+
+
+class _Shard:
+    __slots__ = ('buckets', 'lock', 'throttled')
+
+    def __init__(self):
+        self.buckets = OrderedDict()  # key -> (tokens, updated_at), least recently used first
+        self.lock = threading.Lock()
+        self.throttled = 0
+
+
+class TokenBucketLimiter:
+    """In-process token buckets, split into shards with their own lock.
+
+    Every key owns a bucket of ``burst`` tokens refilled at ``rate`` tokens per
+    second. A shard holds at most ``max_keys_per_shard`` buckets; past that the
+    least recently used one is dropped, which is the bucket idle the longest
+    and so the one most likely to have refilled already.
+    """
+
+    def __init__(self, shards=16, max_keys_per_shard=10000):
+        self.max_keys_per_shard = max_keys_per_shard
+        self._shards = [_Shard() for _ in range(shards)]
+
+    def _shard(self, key):
+        return self._shards[zlib.crc32(key.encode('utf-8')) % len(self._shards)]
+
+    def allow(self, key, rate, burst, cost=1.0):
+        """Take ``cost`` tokens from the bucket of ``key``.
+
+        Returns ``(allowed, retry_after)``, the latter in seconds.
+        """
+        shard = self._shard(key)
+        now = time.monotonic()
+        with shard.lock:
+            buckets = shard.buckets
+            bucket = buckets.get(key)
+            tokens = _refill(bucket[0], bucket[1], now, rate, burst) if bucket else burst
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            else:
+                shard.throttled += 1
+            buckets[key] = (tokens, now)
+            buckets.move_to_end(key)
+            while len(buckets) > self.max_keys_per_shard:
+                buckets.popitem(last=False)
+        if not allowed:
+            return False, (cost - tokens) / rate
+        return True, 0.0
+
+    def reset(self, key):
+        shard = self._shard(key)
+        with shard.lock:
+            shard.buckets.pop(key, None)
+
+    @property
+    def throttled(self):
+        return sum(shard.throttled for shard in self._shards)
+
+    def stats(self):
+        return {
+            'backend': 'memory',
+            'keys': sum(len(shard.buckets) for shard in self._shards),
+            'shards': len(self._shards),
+            'throttled': self.throttled
+        }
+
+
+class SQLiteTokenBucketLimiter:
+    """Token buckets in a SQLite file shared by every worker on the host.
+
+    Each check is one short ``BEGIN IMMEDIATE`` transaction, so concurrent
+    workers serialize on the file lock instead of double-spending tokens.
+    Wall-clock time is used because workers do not share a monotonic clock.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._throttled_lock = threading.Lock()
+        self.throttled = 0
+        connection = self._connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_buckets "
+            "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def allow(self, key, rate, burst, cost=1.0):
+        connection = self._connection()
+        now = time.time()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens = _refill(row[0], row[1], now, rate, burst) if row else burst
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            connection.execute(
+                "INSERT OR REPLACE INTO rate_limit_buckets (key, tokens, updated_at) VALUES (?, ?, ?)",
+                (key, tokens, now)
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        if not allowed:
+            with self._throttled_lock:
+                self.throttled += 1
+            return False, (cost - tokens) / rate
+        return True, 0.0
+
+    def reset(self, key):
+        self._connection().execute("DELETE FROM rate_limit_buckets WHERE key = ?", (key,))
+
+    def prune(self, idle_seconds=3600):
+        """Drop buckets untouched for ``idle_seconds``"""
+        self._connection().execute(
+            "DELETE FROM rate_limit_buckets WHERE updated_at < ?", (time.time() - idle_seconds,)
+        )
+
+    def stats(self):
+        keys = self._connection().execute("SELECT COUNT(*) FROM rate_limit_buckets").fetchone()[0]
+        return {'backend': 'sqlite', 'keys': keys, 'throttled': self.throttled}
+
+
+def create_rate_limiter(config):
+    backend = config['AUTH_RATE_LIMIT_BACKEND']
+    if backend == 'memory':
+        return TokenBucketLimiter()
+    if backend == 'sqlite':
+        return SQLiteTokenBucketLimiter(config['AUTH_RATE_LIMIT_SQLITE_PATH'])
+    raise ValueError(f"Unknown AUTH_RATE_LIMIT_BACKEND '{backend}', expected 'memory' or 'sqlite'")
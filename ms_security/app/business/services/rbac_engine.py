@@ -0,0 +1,286 @@
+import threading
+import time
+from datetime import datetime
+from flask import current_app
+from app.data.database import db
+from app.business.models.role import Role
+from app.business.models.permission import Permission
+from app.business.models.role_permission import RolePermission
+from app.business.models.user_role import UserRole
+from app.business.models.rbac_version import RBACVersion
+from app.business.models.role_closure import RoleClosure
+from app.business.services.permission_set import PermissionSet, EMPTY
+from app.business.services.route_trie import RouteTrie, WILDCARD
+
+
+def normalize_url(url):
+    """Split a URL or route template into path segments.
+
+    Query strings, trailing slashes and the ``/api`` prefix are dropped, and
+    placeholder segments (``?``, ``<id>``, ``<int:id>``, ``:id``) become a
+    wildcard so stored templates and Flask rules compare equal.
+    """
+    segments = (url or '').strip().split('/')
+    # A bare '?' segment is a placeholder; anything after '?' in a segment is a query string
+    if segments[-1] != '?':
+        segments[-1] = segments[-1].split('?', 1)[0]
+    segments = [s for s in segments if s]
+    if segments and segments[0] == 'api':
+        segments = segments[1:]
+    return tuple(
+        WILDCARD if s == '?' or (s.startswith('<') and s.endswith('>')) or s.startswith(':') else s
+        for s in segments
+    )
+
+
+class _CompiledTables:
+    """Snapshot of the RBAC tables used to answer checks.
+
+    Each scope is loaded by its own method so a version change in one table
+    only rebuilds that part.
+    """
+
+    def __init__(self):
+        self.roles = {}             # role_id -> name
+        self.permissions = {}       # permission_id -> (segments, method, entity)
+        self.routes = RouteTrie()   # permission URL templates by segment
+        self.role_permissions = {}  # role_id -> PermissionSet
+        self.role_ancestors = {}    # role_id -> (ancestor_id, ...)
+        self.role_effective = {}    # role_id -> PermissionSet including inherited permissions
+        self.user_roles = {}        # user_id -> ((role_id, startAt, endAt), ...)
+
+    def copy(self):
+        tables = _CompiledTables()
+        tables.__dict__.update(self.__dict__)
+        return tables
+
+    def load_roles(self):
+        self.roles = {role_id: name for role_id, name in db.session.query(Role.id, Role.name)}
+
+    def load_permissions(self):
+        self.permissions = {
+            permission_id: (normalize_url(url), method.upper(), entity)
+            for permission_id, url, method, entity in
+            db.session.query(Permission.id, Permission.url, Permission.method, Permission.entity)
+        }
+        routes = RouteTrie()
+        for permission_id, (segments, method, _) in self.permissions.items():
+            routes.insert(segments, method, permission_id)
+        self.routes = routes
+
+    def load_role_permissions(self):
+        role_permissions = {}
+        for role_id, permission_id in db.session.query(RolePermission.role_id, RolePermission.permission_id):
+            role_permissions[role_id] = role_permissions.get(role_id, 0) | (1 << permission_id)
+        self.role_permissions = {role_id: PermissionSet(bits) for role_id, bits in role_permissions.items()}
+
+    def load_role_hierarchy(self):
+        role_ancestors = {}
+        for ancestor_id, descendant_id in db.session.query(RoleClosure.ancestor_id, RoleClosure.descendant_id):
+            role_ancestors.setdefault(descendant_id, []).append(ancestor_id)
+        self.role_ancestors = {role_id: tuple(ids) for role_id, ids in role_ancestors.items()}
+
+    def compile_inheritance(self):
+        """OR each role's set with the sets of all its ancestors"""
+        role_effective = dict(self.role_permissions)
+        for role_id, ancestor_ids in self.role_ancestors.items():
+            permission_set = self.role_permissions.get(role_id, EMPTY)
+            for ancestor_id in ancestor_ids:
+                permission_set = permission_set | self.role_permissions.get(ancestor_id, EMPTY)
+            role_effective[role_id] = permission_set
+        self.role_effective = role_effective
+
+    def load_user_roles(self):
+        user_roles = {}
+        for user_id, role_id, start_at, end_at in db.session.query(
+                UserRole.user_id, UserRole.role_id, UserRole.startAt, UserRole.endAt):
+            user_roles.setdefault(user_id, []).append((role_id, start_at, end_at))
+        self.user_roles = {user_id: tuple(entries) for user_id, entries in user_roles.items()}
+
+
+class RBACEngine:
+    """In-memory authorization engine compiled from the RBAC tables.
+
+    The tables are read once with column projections and compiled into plain
+    dictionaries, so a check is a few hash lookups with no database access.
+    Other workers announce changes through the ``rbac_versions`` counters,
+    which are polled at most once per ``RBAC_VERSION_CHECK_INTERVAL`` seconds.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tables = None
+        self._versions = {}
+        self._checked_at = 0.0
+        self.generation = 0
+
+    def load(self):
+        """Read the roles, permissions, their assignments and the role hierarchy and swap in new tables"""
+        with self._lock:
+            versions = RBACVersion.current()
+            tables = _CompiledTables()
+            for scope in RBACVersion.SCOPES:
+                getattr(tables, 'load_' + scope)()
+            tables.compile_inheritance()
+            self._tables, self._versions = tables, versions
+            self.generation += 1
+            self._checked_at = time.monotonic()
+            return tables
+
+    def refresh(self):
+        """Rebuild the scopes whose version changed since they were loaded.
+
+        Returns the set of scopes that were rebuilt. If another thread is
+        already refreshing, the current tables are kept and nothing is rebuilt.
+        """
+        if not self._lock.acquire(blocking=False):
+            return set()
+        try:
+            versions = RBACVersion.current()
+            changed = {scope for scope in RBACVersion.SCOPES if versions.get(scope) != self._versions.get(scope)}
+            if changed:
+                tables = self._tables.copy()
+                for scope in RBACVersion.SCOPES:
+                    if scope in changed:
+                        getattr(tables, 'load_' + scope)()
+                if changed & {'role_permissions', 'role_hierarchy'}:
+                    tables.compile_inheritance()
+                self._tables, self._versions = tables, versions
+                self.generation += 1
+            self._checked_at = time.monotonic()
+            return changed
+        finally:
+            self._lock.release()
+
+    def _apply_local_change(self, scope, apply):
+        """Apply a change this worker just committed without reloading the scope.
+
+        If the scope's counter moved by exactly one, the change is ours and is
+        applied in place; otherwise other workers changed it too and the next
+        check reloads the scope.
+        """
+        with self._lock:
+            if self._tables is None:
+                return
+            versions = RBACVersion.current()
+            if versions.get(scope) == self._versions.get(scope, 0) + 1:
+                apply(self._tables)
+                self._versions[scope] = versions[scope]
+                self.generation += 1
+            else:
+                self._checked_at = 0.0
+
+    def permission_saved(self, permission_id, url, method, entity):
+        """Index a permission created or updated by this worker"""
+        def apply(tables):
+            previous = tables.permissions.get(permission_id)
+            if previous is not None:
+                tables.routes.remove(previous[0], previous[1], permission_id)
+            segments = normalize_url(url)
+            tables.permissions[permission_id] = (segments, method.upper(), entity)
+            tables.routes.insert(segments, method.upper(), permission_id)
+        self._apply_local_change('permissions', apply)
+
+    def permission_deleted(self, permission_id):
+        """Drop a permission deleted by this worker from the index"""
+        def apply(tables):
+            previous = tables.permissions.pop(permission_id, None)
+            if previous is not None:
+                tables.routes.remove(previous[0], previous[1], permission_id)
+        self._apply_local_change('permissions', apply)
+
+    def mark_stale(self):
+        """Force a version check on the next authorization"""
+        self._checked_at = 0.0
+
+    def current_generation(self):
+        """Number of table rebuilds so far, after the periodic version check"""
+        self._get_tables()
+        return self.generation
+
+    def versions(self):
+        """Get the counters the current tables were built from"""
+        self._get_tables()
+        return dict(self._versions)
+
+    def _get_tables(self):
+        if self._tables is None:
+            return self.load()
+        interval = current_app.config.get('RBAC_VERSION_CHECK_INTERVAL', 1.0)
+        if time.monotonic() - self._checked_at >= interval:
+            self.refresh()
+        return self._tables
+
+    @staticmethod
+    def _match(tables, url, method):
+        return tables.routes.match(normalize_url(url), method.upper())
+
+    @staticmethod
+    def _active_role_ids(tables, user_id, now):
+        return [
+            role_id for role_id, start_at, end_at in tables.user_roles.get(user_id, ())
+            if (start_at is None or start_at <= now) and (end_at is None or end_at > now)
+        ]
+
+    def authorize(self, user_id, url, method, now=None):
+        """Decide whether a user may call ``method url``.
+
+        Returns a dict with the decision, the matched permission (if any) and
+        the active roles that grant it.
+        """
+        tables = self._get_tables()
+        now = now or datetime.utcnow()
+        permission_id = self._match(tables, url, method)
+        granting = []
+        if permission_id is not None:
+            granting = [
+                role_id for role_id in self._active_role_ids(tables, user_id, now)
+                if tables.role_effective.get(role_id, EMPTY).has(permission_id)
+            ]
+        return {
+            'allowed': bool(granting),
+            'permission_id': permission_id,
+            'roles': [tables.roles.get(role_id) for role_id in granting]
+        }
+
+
+    def authorize_many(self, user_id, checks, now=None):
+        """Decide a list of ``(url, method)`` pairs for one user.
+
+        The user's active roles and their permissions are resolved once, so
+        each pair only costs a template match and a set lookup.
+        """
+        tables = self._get_tables()
+        granted = self._user_permission_set(tables, user_id, now or datetime.utcnow())
+        return [granted.has(self._match(tables, url, method)) for url, method in checks]
+
+    @staticmethod
+    def _user_permission_set(tables, user_id, now):
+        granted = EMPTY
+        for role_id in RBACEngine._active_role_ids(tables, user_id, now):
+            granted = granted | tables.role_effective.get(role_id, EMPTY)
+        return granted
+
+    def user_permission_set(self, user_id, now=None):
+        """The user's effective permissions: the OR of their active roles' sets"""
+        return self._user_permission_set(self._get_tables(), user_id, now or datetime.utcnow())
+
+
+    def resolve_rule(self, rule, method):
+        """Permission id of a Flask URL rule (e.g. ``/api/users/<int:user_id>``), or None.
+
+        Rules are templates, so this is an exact lookup rather than a match.
+        """
+        return self._get_tables().routes.find(normalize_url(rule), method.upper())
+
+    def check(self, user_id, permission_id, now=None):
+        """Whether any of the user's active roles grants ``permission_id``"""
+        tables = self._get_tables()
+        now = now or datetime.utcnow()
+        return any(
+            tables.role_effective.get(role_id, EMPTY).has(permission_id)
+            for role_id in self._active_role_ids(tables, user_id, now)
+        )
+
+
+rbac_engine = RBACEngine()
@@ -0,0 +1,90 @@
+import threading
+import time
+from datetime import datetime
+from flask import current_app
+from app.data.database import db
+from app.business.models.revoked_token import RevokedToken
+from app.business.services.session_store import get_session_store
+
+
+class RevocationList:
+    """Hashes of signed session tokens that must be rejected before they expire.
+
+    The set is rebuilt every ``SESSION_REVOCATION_REFRESH_INTERVAL`` seconds
+    from the non-active sessions of the configured session store and the
+    ``revoked_tokens`` table, so revocations made by other workers are seen
+    after at most one interval. Changes made by this worker are applied to
+    the set right away.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hashes = frozenset()
+        self._loaded_at = None
+
+    def refresh(self, now=None):
+        """Reload the set and return its size"""
+        now = now or datetime.utcnow()
+        revoked = db.session.execute(
+            db.select(RevokedToken.token_hash).where(RevokedToken.expiration > now)
+        ).scalars()
+        hashes = frozenset(get_session_store().revoked_hashes(now)).union(revoked)
+        with self._lock:
+            self._hashes = hashes
+            self._loaded_at = time.monotonic()
+        return len(hashes)
+
+    def is_revoked(self, token_hash):
+        if self._loaded_at is None:
+            self.refresh()
+        return token_hash in self._hashes
+
+    def add(self, *token_hashes):
+        with self._lock:
+            self._hashes = self._hashes | frozenset(token_hashes)
+
+    def discard(self, *token_hashes):
+        with self._lock:
+            self._hashes = self._hashes - frozenset(token_hashes)
+
+    def track(self, token_hash, state):
+        """Follow a state change of a session made by this worker"""
+        if state == 'active':
+            self.discard(token_hash)
+        else:
+            self.add(token_hash)
+
+    def revoke(self, tokens, now=None):
+        """Record ``(token_hash, expiration)`` pairs of tokens that no longer have an active session.
+
+        Only used in signed token mode, and only for tokens that have not
+        expired yet. Stages the rows; the caller commits.
+        """
+        if current_app.config['SESSION_TOKEN_MODE'] != 'signed':
+            return
+        now = now or datetime.utcnow()
+        live = [(token_hash, expiration) for token_hash, expiration in tokens if token_hash and expiration > now]
+        for token_hash, expiration in live:
+            db.session.merge(RevokedToken(token_hash=token_hash, expiration=expiration))
+        if live:
+            self.add(*(token_hash for token_hash, _ in live))
+
+    @staticmethod
+    def purge(cutoff, limit):
+        """Delete up to ``limit`` entries that expired before ``cutoff``; returns how many"""
+        hashes = db.session.execute(
+            db.select(RevokedToken.token_hash).where(RevokedToken.expiration < cutoff).limit(limit)
+        ).scalars().all()
+        if hashes:
+            db.session.execute(db.delete(RevokedToken).where(RevokedToken.token_hash.in_(hashes)))
+        db.session.commit()
+        return len(hashes)
+
+    def stats(self):
+        return {
+            'size': len(self._hashes),
+            'age_seconds': time.monotonic() - self._loaded_at if self._loaded_at is not None else None
+        }
+
+
+revocation_list = RevocationList()
@@ -0,0 +1,94 @@
+from app.data.database import db
+from app.business.models.permission import Permission
+from app.business.models.role_permission import RolePermission
+from app.business.models.role_closure import RoleClosure
+
+
+class RoleHierarchyError(ValueError):
+    """Raised when a hierarchy change would create a cycle"""
+
+
+class RoleHierarchyService:
+    """Maintains the ``role_closure`` transitive-closure table.
+
+    Roles inherit every permission of their ancestors. Edits rewrite only the
+    closure rows of the moved subtree, and reads are single indexed queries.
+    Methods stage statements in the current transaction; callers commit.
+    """
+
+    @staticmethod
+    def get_parent_id(role_id):
+        row = db.session.query(RoleClosure.ancestor_id).filter_by(descendant_id=role_id, depth=1).first()
+        return row[0] if row else None
+
+    @staticmethod
+    def ancestors(role_id):
+        """[(ancestor_id, depth)] of a role, nearest first"""
+        return db.session.query(RoleClosure.ancestor_id, RoleClosure.depth)\
+            .filter(RoleClosure.descendant_id == role_id)\
+            .order_by(RoleClosure.depth)\
+            .all()
+
+    @staticmethod
+    def subtree(role_id):
+        """[(descendant_id, depth)] of a role, including the role itself at depth 0"""
+        rows = db.session.query(RoleClosure.descendant_id, RoleClosure.depth)\
+            .filter(RoleClosure.ancestor_id == role_id)\
+            .all()
+        return [(role_id, 0)] + [tuple(row) for row in rows]
+
+    @staticmethod
+    def set_parent(role_id, parent_id):
+        """Move a role (and its descendants) under ``parent_id``, or detach it with None"""
+        subtree = RoleHierarchyService.subtree(role_id)
+        subtree_ids = [descendant_id for descendant_id, _ in subtree]
+        if parent_id is not None and parent_id in subtree_ids:
+            raise RoleHierarchyError("A role cannot inherit from itself or one of its descendants")
+
+        # Cut every path entering the subtree from outside it
+        db.session.execute(
+            db.delete(RoleClosure).where(
+                RoleClosure.descendant_id.in_(subtree_ids),
+                RoleClosure.ancestor_id.notin_(subtree_ids)
+            )
+        )
+        if parent_id is None:
+            return
+
+        new_ancestors = [(parent_id, 0)] + [tuple(row) for row in RoleHierarchyService.ancestors(parent_id)]
+        db.session.execute(
+            db.insert(RoleClosure),
+            [
+                {'ancestor_id': ancestor_id, 'descendant_id': descendant_id, 'depth': ancestor_depth + 1 + depth}
+                for ancestor_id, ancestor_depth in new_ancestors
+                for descendant_id, depth in subtree
+            ]
+        )
+
+    @staticmethod
+    def remove_role(role_id):
+        """Drop a role from the hierarchy; its children become roots.
+
+        Returns the ids of the former descendants, whose inherited
+        permissions changed.
+        """
+        descendants = [d for d, depth in RoleHierarchyService.subtree(role_id) if depth > 0]
+        ancestors = [a for a, _ in RoleHierarchyService.ancestors(role_id)]
+        db.session.execute(
+            db.delete(RoleClosure).where(
+                RoleClosure.ancestor_id.in_(ancestors + [role_id]),
+                RoleClosure.descendant_id.in_(descendants + [role_id])
+            )
+        )
+        return descendants
+
+    @staticmethod
+    def get_permissions(role_id):
+        """All permissions of a role including inherited ones, in one query"""
+        inherited = db.select(RoleClosure.ancestor_id).where(RoleClosure.descendant_id == role_id)
+        return db.session.query(Permission)\
+            .join(RolePermission, RolePermission.permission_id == Permission.id)\
+            .filter((RolePermission.role_id == role_id) | RolePermission.role_id.in_(inherited))\
+            .distinct()\
+            .order_by(Permission.id)\
+            .all()
@@ -0,0 +1,109 @@
+import threading
+
+WILDCARD = '*'
+
+
+class _Node:
+    __slots__ = ('static', 'wildcard', 'methods')
+
+    def __init__(self):
+        self.static = {}      # segment -> _Node
+        self.wildcard = None  # _Node for a placeholder segment
+        self.methods = {}     # method -> frozenset(permission_id)
+
+
+class RouteTrie:
+    """Radix-style index of permission URL templates by path segment.
+
+    Matching a concrete path walks one node per segment, so its cost depends
+    on the path length instead of the number of stored templates. Static
+    segments win over placeholders (left to right); when several
+    permissions share a template and method, the lowest id wins.
+
+    Writes take a lock; reads do not, so lookups never wait on an update.
+    Id sets are immutable and replaced on write, so a read never iterates a
+    set that is being changed.
+    """
+
+    def __init__(self):
+        self._root = _Node()
+        self._lock = threading.Lock()
+        self._size = 0
+
+    def insert(self, segments, method, permission_id):
+        with self._lock:
+            node = self._root
+            for segment in segments:
+                if segment == WILDCARD:
+                    if node.wildcard is None:
+                        node.wildcard = _Node()
+                    node = node.wildcard
+                else:
+                    child = node.static.get(segment)
+                    if child is None:
+                        child = node.static[segment] = _Node()
+                    node = child
+            ids = node.methods.get(method, frozenset())
+            if permission_id not in ids:
+                node.methods[method] = ids | {permission_id}
+                self._size += 1
+
+    def remove(self, segments, method, permission_id):
+        """Remove one template; empty branches are pruned"""
+        with self._lock:
+            path = []
+            node = self._root
+            for segment in segments:
+                child = node.wildcard if segment == WILDCARD else node.static.get(segment)
+                if child is None:
+                    return False
+                path.append((node, segment))
+                node = child
+            ids = node.methods.get(method)
+            if not ids or permission_id not in ids:
+                return False
+            ids = ids - {permission_id}
+            self._size -= 1
+            if ids:
+                node.methods[method] = ids
+            else:
+                del node.methods[method]
+            # Prune nodes left without templates or children
+            while path and not node.methods and not node.static and node.wildcard is None:
+                parent, segment = path.pop()
+                if segment == WILDCARD:
+                    parent.wildcard = None
+                else:
+                    del parent.static[segment]
+                node = parent
+            return True
+
+    def find(self, segments, method):
+        """Permission id stored for exactly this template, or None"""
+        node = self._root
+        for segment in segments:
+            node = node.wildcard if segment == WILDCARD else node.static.get(segment)
+            if node is None:
+                return None
+        ids = node.methods.get(method)
+        return min(ids) if ids else None
+
+    def match(self, segments, method):
+        """Permission id whose template matches the concrete path, or None"""
+        return self._match(self._root, segments, 0, method)
+
+    def _match(self, node, segments, index, method):
+        if index == len(segments):
+            ids = node.methods.get(method)
+            return min(ids) if ids else None
+        child = node.static.get(segments[index])
+        if child is not None:
+            found = self._match(child, segments, index + 1, method)
+            if found is not None:
+                return found
+        if node.wildcard is not None:
+            return self._match(node.wildcard, segments, index + 1, method)
+        return None
+
+    def __len__(self):
+        return self._size
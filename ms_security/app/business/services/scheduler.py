@@ -0,0 +1,55 @@
+import atexit
+import threading
+
+
+class PeriodicTask:
+    """Run a function every ``interval`` seconds in a daemon thread.
+
+    Each run happens inside an application context, so the function can use
+    ``db.session`` like any request handler. Errors are logged and the task
+    keeps running.
+    """
+
+    def __init__(self, name, interval, func):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self, app):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, args=(app,), name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def run_once(self, app):
+        with app.app_context():
+            try:
+                return self.func()
+            except Exception:
+                app.logger.exception("Periodic task %s failed", self.name)
+
+    def _run(self, app):
+        while not self._stop.wait(self.interval):
+            self.run_once(app)
+
+
+def schedule(app, name, interval, func, run_at_exit=False):
+    """Start ``func`` as a periodic task of ``app``; an interval of 0 disables it.
+
+    With ``run_at_exit`` the function also runs once when the process exits,
+    e.g. to flush buffered writes.
+    """
+    if not interval or interval <= 0:
+        return None
+    task = PeriodicTask(name, interval, func)
+    app.extensions.setdefault('periodic_tasks', {})[name] = task
+    task.start(app)
+    if run_at_exit:
+        atexit.register(task.run_once, app)
+    atexit.register(task.stop)
+    return task
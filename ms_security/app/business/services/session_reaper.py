@@ -0,0 +1,60 @@
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from app.data.database import db
+from app.business.services.metrics import Metrics
+from app.business.services.revocation_list import revocation_list
+from app.business.services.session_store import get_session_store
+from app.business.services.session_validator import session_validator
+
+
+class SessionReaper:
+    """Deletes expired and terminated sessions in small batches.
+
+    Each batch removes at most ``SESSION_REAPER_BATCH_SIZE`` sessions; with
+    the SQL store they are selected through the ``expiration`` and ``state``
+    indexes and deleted and committed in one short statement. The reaper
+    sleeps ``SESSION_REAPER_PAUSE`` seconds between batches to let requests
+    through and stops after ``SESSION_REAPER_MAX_BATCHES`` batches per run.
+    """
+
+    def __init__(self):
+        self.metrics = Metrics()
+
+    def reap(self, now=None):
+        """Run one pass and return the number of sessions deleted"""
+        config = current_app.config
+        store = get_session_store()
+        batch_size = config['SESSION_REAPER_BATCH_SIZE']
+        cutoff = (now or datetime.utcnow()) - timedelta(seconds=config['SESSION_REAPER_GRACE'])
+        started = time.perf_counter()
+        reaped = 0
+        for batch in range(config['SESSION_REAPER_MAX_BATCHES']):
+            if batch:
+                time.sleep(config['SESSION_REAPER_PAUSE'])
+            batch_started = time.perf_counter()
+            removed = store.purge(cutoff, config['SESSION_REAPER_STATES'], batch_size)
+            session_validator.invalidate(*(token_hash for token_hash, _ in removed))
+            # Terminated sessions can be reaped before their signed tokens expire
+            revocation_list.revoke(removed)
+            db.session.commit()
+            self.metrics.observe('batch', time.perf_counter() - batch_started)
+            reaped += len(removed)
+            if len(removed) < batch_size:
+                break
+        for _ in range(config['SESSION_REAPER_MAX_BATCHES']):
+            purged = revocation_list.purge(cutoff, batch_size)
+            self.metrics.incr('revocations_purged', purged)
+            if purged < batch_size:
+                break
+            time.sleep(config['SESSION_REAPER_PAUSE'])
+        self.metrics.incr('runs')
+        self.metrics.incr('reaped', reaped)
+        self.metrics.observe('run', time.perf_counter() - started)
+        return reaped
+
+    def get_metrics(self):
+        return self.metrics.snapshot()
+
+
+session_reaper = SessionReaper()
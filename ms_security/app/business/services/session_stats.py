@@ -0,0 +1,47 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from app.business.services.session_store import get_session_store
+
+
+class SessionStats:
+    """Aggregated session counts, recomputed at most every ``SESSION_STATS_TTL`` seconds.
+
+    Concurrent callers share one snapshot: while one request recomputes it,
+    the others keep getting the previous one instead of running the same
+    queries.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._computed_at = 0.0
+
+    def get(self):
+        ttl = current_app.config['SESSION_STATS_TTL']
+        if self._snapshot is None or time.monotonic() - self._computed_at >= ttl:
+            if self._lock.acquire(blocking=self._snapshot is None):
+                try:
+                    if self._snapshot is None or time.monotonic() - self._computed_at >= ttl:
+                        self._snapshot = self.compute()
+                        self._computed_at = time.monotonic()
+                finally:
+                    self._lock.release()
+        return self._snapshot
+
+    @staticmethod
+    def compute(now=None):
+        config = current_app.config
+        now = now or datetime.utcnow()
+        snapshot = get_session_store().stats(
+            now, config['SESSION_STATS_TOP_USERS'], now - timedelta(hours=config['SESSION_STATS_HOURS'])
+        )
+        snapshot['computed_at'] = now
+        return snapshot
+
+    def clear(self):
+        self._snapshot = None
+
+
+session_stats = SessionStats()
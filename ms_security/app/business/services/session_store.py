@@ -0,0 +1,440 @@
+import hashlib
+import heapq
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from collections import Counter
+from datetime import datetime
+from flask import current_app
+from app.data.database import db
+from app.business.models.session import Session
+
+
+def hash_token(token):
+    """Hex SHA-256 of a session token, as stored in ``sessions.token_hash``"""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+class SessionStore(ABC):
+    """Where sessions live. Select the backend with ``SESSION_STORE``.
+
+    Sessions are exchanged as dicts shaped like ``Session.to_dict()``.
+    ``fields`` holds the writable columns: token, expiration, FACode, state, ip.
+    ``filters`` select sessions by ``user_id``, ``user_ids`` (a list), ``ip``,
+    ``state`` and ``expires_before`` (all given ones must match).
+    """
+
+    # Whether token lookups are slow enough to be worth caching per worker
+    cache_lookups = False
+
+    @abstractmethod
+    def all(self):
+        ...
+
+    @abstractmethod
+    def get(self, session_id):
+        ...
+
+    @abstractmethod
+    def for_user(self, user_id):
+        ...
+
+    @abstractmethod
+    def lookup(self, token_hash):
+        """``(session_id, user_id, expiration, state, last_activity_at)`` for a token hash, or None"""
+
+    @abstractmethod
+    def create(self, user_id, fields, session_id=None):
+        """Store a new session; ``session_id`` defaults to a new UUID"""
+
+    @abstractmethod
+    def update(self, session_id, fields):
+        """Apply ``fields`` and return the updated session, or None if it does not exist"""
+
+    @abstractmethod
+    def delete(self, session_id):
+        """Delete a session and return its ``(token_hash, expiration)``, or None if it does not exist"""
+
+    @abstractmethod
+    def delete_for_user(self, user_id):
+        """Delete all sessions of a user and return their ``(token_hash, expiration)`` pairs"""
+
+    @abstractmethod
+    def set_state(self, filters, state):
+        """Move all sessions matching ``filters`` to ``state``.
+
+        Returns the ``(token_hash, expiration)`` pairs of the sessions changed.
+        """
+
+    @abstractmethod
+    def revoked_hashes(self, now):
+        """Token hashes of sessions that are not active and expire after ``now``"""
+
+    @abstractmethod
+    def record_activity(self, last_seen):
+        """Store ``{session_id: datetime}`` last-activity times, keeping newer stored values"""
+
+    @abstractmethod
+    def stats(self, now, top_users, since):
+        """Session counts: ``active``, ``expired``, ``total``, ``by_state``,
+        ``top_users`` (user id and session count) and ``created_per_hour``
+        (``'YYYY-MM-DD HH:00'`` -> count) for sessions created after ``since``.
+        """
+
+    @abstractmethod
+    def purge(self, cutoff, states, limit):
+        """Delete up to ``limit`` sessions that expired, or entered one of
+        ``states``, before ``cutoff``. Returns their ``(token_hash, expiration)`` pairs.
+        """
+
+
+class SQLSessionStore(SessionStore):
+    """Sessions in the ``sessions`` table; every write commits"""
+
+    cache_lookups = True
+
+    def all(self):
+        return [session.to_dict() for session in Session.query.all()]
+
+    def get(self, session_id):
+        session = Session.query.get(session_id)
+        return session.to_dict() if session else None
+
+    def for_user(self, user_id):
+        return [session.to_dict() for session in Session.query.filter_by(user_id=user_id).all()]
+
+    def lookup(self, token_hash):
+        row = db.session.query(Session.id, Session.user_id, Session.expiration, Session.state,
+                               Session.last_activity_at)\
+            .filter(Session.token_hash == token_hash)\
+            .first()
+        return tuple(row) if row is not None else None
+
+    def create(self, user_id, fields, session_id=None):
+        session = Session(id=session_id or str(uuid.uuid4()), user_id=user_id, token_hash=hash_token(fields['token']), **fields)
+        db.session.add(session)
+        db.session.commit()
+        return session.to_dict()
+
+    def update(self, session_id, fields):
+        session = Session.query.get(session_id)
+        if not session:
+            return None
+        for name, value in fields.items():
+            setattr(session, name, value)
+        if 'token' in fields:
+            session.token_hash = hash_token(fields['token'])
+        db.session.commit()
+        return session.to_dict()
+
+    def delete(self, session_id):
+        session = Session.query.get(session_id)
+        if not session:
+            return None
+        removed = (session.token_hash, session.expiration)
+        db.session.delete(session)
+        db.session.commit()
+        return removed
+
+    def delete_for_user(self, user_id):
+        """Stages the delete; the caller commits together with its own changes"""
+        removed = [tuple(row) for row in db.session.query(Session.token_hash, Session.expiration).filter_by(user_id=user_id)]
+        db.session.execute(db.delete(Session).where(Session.user_id == user_id))
+        return removed
+
+    @staticmethod
+    def _conditions(filters):
+        conditions = []
+        if filters.get('user_id') is not None:
+            conditions.append(Session.user_id == filters['user_id'])
+        if filters.get('user_ids') is not None:
+            conditions.append(Session.user_id.in_(filters['user_ids']))
+        if filters.get('ip') is not None:
+            conditions.append(Session.ip == filters['ip'])
+        if filters.get('state') is not None:
+            conditions.append(Session.state == filters['state'])
+        if filters.get('expires_before') is not None:
+            conditions.append(Session.expiration < filters['expires_before'])
+        return conditions
+
+    def set_state(self, filters, state):
+        """One UPDATE; on databases without UPDATE ... RETURNING the keys are read first"""
+        statement = db.update(Session)\
+            .where(Session.state != state, *self._conditions(filters))\
+            .values(state=state, updated_at=datetime.utcnow())
+        if db.session.get_bind().dialect.update_returning:
+            changed = db.session.execute(statement.returning(Session.token_hash, Session.expiration)).all()
+        else:
+            changed = db.session.query(Session.token_hash, Session.expiration)\
+                .filter(Session.state != state, *self._conditions(filters)).all()
+            db.session.execute(statement)
+        db.session.commit()
+        return [tuple(row) for row in changed]
+
+    def revoked_hashes(self, now):
+        return db.session.execute(
+            db.select(Session.token_hash).where(
+                Session.state != 'active', Session.expiration > now, Session.token_hash.is_not(None))
+        ).scalars().all()
+
+    def record_activity(self, last_seen):
+        """One UPDATE statement executed for all sessions (``executemany``)"""
+        table = Session.__table__
+        statement = table.update()\
+            .where(table.c.id == db.bindparam('session_id'))\
+            .where(db.or_(table.c.last_activity_at.is_(None), table.c.last_activity_at < db.bindparam('seen_at')))\
+            .values(last_activity_at=db.bindparam('seen_at'))
+        db.session.execute(statement, [
+            {'session_id': session_id, 'seen_at': seen_at} for session_id, seen_at in last_seen.items()
+        ])
+        db.session.commit()
+
+    @staticmethod
+    def _hour(column):
+        """``'YYYY-MM-DD HH:00'`` of a datetime column, in the dialect at hand"""
+        dialect = db.session.get_bind().dialect.name
+        if dialect == 'sqlite':
+            return db.func.strftime('%Y-%m-%d %H:00', column)
+        if dialect == 'postgresql':
+            return db.func.to_char(db.func.date_trunc('hour', column), 'YYYY-MM-DD HH24:00')
+        return db.func.date_format(column, '%Y-%m-%d %H:00')
+
+    def stats(self, now, top_users, since):
+        """Four aggregate queries, none of which loads session rows"""
+        total, active, expired = db.session.query(
+            db.func.count(Session.id),
+            db.func.count(db.case((db.and_(Session.state == 'active', Session.expiration > now), 1))),
+            db.func.count(db.case((Session.expiration <= now, 1)))
+        ).one()
+        by_state = db.session.query(Session.state, db.func.count(Session.id)).group_by(Session.state).all()
+        count = db.func.count(Session.id).label('sessions')
+        top = db.session.query(Session.user_id, count)\
+            .group_by(Session.user_id)\
+            .order_by(count.desc())\
+            .limit(top_users)\
+            .all()
+        hour = self._hour(Session.created_at).label('hour')
+        per_hour = db.session.query(hour, db.func.count(Session.id))\
+            .filter(Session.created_at >= since)\
+            .group_by(hour)\
+            .order_by(hour)\
+            .all()
+        return {
+            'total': total,
+            'active': active,
+            'expired': expired,
+            'by_state': dict(by_state),
+            'top_users': [{'user_id': user_id, 'sessions': sessions} for user_id, sessions in top],
+            'created_per_hour': dict(per_hour)
+        }
+
+    def purge(self, cutoff, states, limit):
+        condition = Session.expiration < cutoff
+        if states:
+            condition = db.or_(condition, db.and_(Session.state.in_(states), Session.updated_at < cutoff))
+        rows = db.session.query(Session.id, Session.token_hash, Session.expiration).filter(condition).limit(limit).all()
+        if not rows:
+            db.session.rollback()
+            return []
+        db.session.execute(db.delete(Session).where(Session.id.in_([row.id for row in rows])))
+        db.session.commit()
+        return [(row.token_hash, row.expiration) for row in rows]
+
+
+class MemorySessionStore(SessionStore):
+    """Sessions kept in process memory, indexed by id, token hash and user.
+
+    Expired sessions stay, as rows do in the SQL store, until ``purge`` pops
+    them from a min-heap of ``(expiration, session_id)``, so both stores
+    report the same sessions and counts. Entries left behind by an
+    expiration change are skipped when popped.
+    Sessions are lost on restart and are not shared between workers, so use
+    it with a single worker process.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._sessions = {}  # session_id -> session dict (with 'token_hash')
+        self._by_token = {}  # token_hash -> session_id
+        self._by_user = {}   # user_id -> set(session_id)
+        self._expiry = []    # heap of (expiration, session_id)
+
+    @staticmethod
+    def _public(session):
+        return {name: value for name, value in session.items() if name != 'token_hash'}
+
+    def _remove(self, session_id):
+        session = self._sessions.pop(session_id)
+        self._by_token.pop(session['token_hash'], None)
+        user_sessions = self._by_user.get(session['user_id'])
+        if user_sessions is not None:
+            user_sessions.discard(session_id)
+            if not user_sessions:
+                del self._by_user[session['user_id']]
+        return session['token_hash'], session['expiration']
+
+    def _expire(self, now, limit=None):
+        removed = []
+        while self._expiry and self._expiry[0][0] <= now and (limit is None or len(removed) < limit):
+            expiration, session_id = heapq.heappop(self._expiry)
+            session = self._sessions.get(session_id)
+            if session is not None and session['expiration'] == expiration:
+                removed.append(self._remove(session_id))
+        return removed
+
+    def all(self):
+        with self._lock:
+            return [self._public(session) for session in self._sessions.values()]
+
+    def get(self, session_id):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            return self._public(session) if session else None
+
+    def for_user(self, user_id):
+        with self._lock:
+            return [self._public(self._sessions[session_id]) for session_id in self._by_user.get(user_id, ())]
+
+    def lookup(self, token_hash):
+        with self._lock:
+            session_id = self._by_token.get(token_hash)
+            if session_id is None:
+                return None
+            session = self._sessions[session_id]
+            return session['id'], session['user_id'], session['expiration'], session['state'], \
+                session['last_activity_at']
+
+    def create(self, user_id, fields, session_id=None):
+        now = datetime.utcnow()
+        session = {
+            'id': session_id or str(uuid.uuid4()),
+            'user_id': user_id,
+            'token': fields['token'],
+            'token_hash': hash_token(fields['token']),
+            'expiration': fields['expiration'],
+            'FACode': fields.get('FACode'),
+            'ip': fields.get('ip'),
+            'state': fields.get('state', 'active'),
+            'last_activity_at': None,
+            'created_at': now,
+            'updated_at': now
+        }
+        with self._lock:
+            self._sessions[session['id']] = session
+            self._by_token[session['token_hash']] = session['id']
+            self._by_user.setdefault(user_id, set()).add(session['id'])
+            heapq.heappush(self._expiry, (session['expiration'], session['id']))
+        return self._public(session)
+
+    def update(self, session_id, fields):
+        now = datetime.utcnow()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            if 'token' in fields:
+                self._by_token.pop(session['token_hash'], None)
+                session['token_hash'] = hash_token(fields['token'])
+                self._by_token[session['token_hash']] = session_id
+            if 'expiration' in fields and fields['expiration'] != session['expiration']:
+                heapq.heappush(self._expiry, (fields['expiration'], session_id))
+            session.update(fields)
+            session['updated_at'] = now
+            return self._public(session)
+
+    def delete(self, session_id):
+        with self._lock:
+            if session_id not in self._sessions:
+                return None
+            return self._remove(session_id)
+
+    def delete_for_user(self, user_id):
+        with self._lock:
+            return [self._remove(session_id) for session_id in list(self._by_user.get(user_id, ()))]
+
+    @staticmethod
+    def _matches(session, filters):
+        return (
+            (filters.get('user_id') is None or session['user_id'] == filters['user_id'])
+            and (filters.get('user_ids') is None or session['user_id'] in filters['user_ids'])
+            and (filters.get('ip') is None or session['ip'] == filters['ip'])
+            and (filters.get('state') is None or session['state'] == filters['state'])
+            and (filters.get('expires_before') is None or session['expiration'] < filters['expires_before'])
+        )
+
+    def set_state(self, filters, state):
+        now = datetime.utcnow()
+        with self._lock:
+            if filters.get('user_id') is not None or filters.get('user_ids') is not None:
+                user_ids = [filters['user_id']] if filters.get('user_id') is not None else filters['user_ids']
+                candidates = [
+                    self._sessions[session_id] for user_id in set(user_ids) for session_id in self._by_user.get(user_id, ())
+                ]
+            else:
+                candidates = list(self._sessions.values())
+            changed = []
+            for session in candidates:
+                if session['state'] != state and self._matches(session, filters):
+                    session['state'] = state
+                    session['updated_at'] = now
+                    changed.append((session['token_hash'], session['expiration']))
+            return changed
+
+    def revoked_hashes(self, now):
+        with self._lock:
+            return [session['token_hash'] for session in self._sessions.values()
+                    if session['state'] != 'active' and session['expiration'] > now]
+
+    def record_activity(self, last_seen):
+        with self._lock:
+            for session_id, seen_at in last_seen.items():
+                session = self._sessions.get(session_id)
+                if session is not None and (session['last_activity_at'] is None or session['last_activity_at'] < seen_at):
+                    session['last_activity_at'] = seen_at
+
+    def stats(self, now, top_users, since):
+        with self._lock:
+            sessions = list(self._sessions.values())
+        per_hour = Counter(
+            session['created_at'].strftime('%Y-%m-%d %H:00') for session in sessions if session['created_at'] >= since
+        )
+        return {
+            'total': len(sessions),
+            'active': sum(1 for session in sessions if session['state'] == 'active' and session['expiration'] > now),
+            'expired': sum(1 for session in sessions if session['expiration'] <= now),
+            'by_state': dict(Counter(session['state'] for session in sessions)),
+            'top_users': [
+                {'user_id': user_id, 'sessions': count}
+                for user_id, count in Counter(session['user_id'] for session in sessions).most_common(top_users)
+            ],
+            'created_per_hour': dict(sorted(per_hour.items()))
+        }
+
+    def purge(self, cutoff, states, limit):
+        with self._lock:
+            removed = self._expire(cutoff, limit)
+            if states and len(removed) < limit:
+                terminated = [
+                    session_id for session_id, session in self._sessions.items()
+                    if session['state'] in states and session['updated_at'] < cutoff
+                ][:limit - len(removed)]
+                removed.extend(self._remove(session_id) for session_id in terminated)
+            return removed
+
+
+SESSION_STORES = {
+    'sql': SQLSessionStore,
+    'memory': MemorySessionStore
+}
+
+
+def create_session_store(name):
+    try:
+        return SESSION_STORES[name]()
+    except KeyError:
+        raise ValueError(f"Unknown SESSION_STORE '{name}', expected one of: {', '.join(SESSION_STORES)}")
+
+
+def get_session_store():
+    """Session store of the current application"""
+    return current_app.extensions['session_store']
@@ -0,0 +1,126 @@
+from datetime import datetime
+from flask import current_app
+from app.data.database import db
+from app.business.models.session import Session
+from app.business.services.lru_cache import LRUCache
+from app.business.services.session_store import get_session_store, hash_token
+from app.business.services.revocation_list import revocation_list
+from app.business.services.activity_tracker import activity_tracker
+from app.business.services import signed_tokens
+
+_IDLE = "Session idle timeout"
+
+
+class SessionValidator:
+    """Resolves session tokens through the session store.
+
+    With the SQL store, lookups go through the unique ``token_hash`` index
+    and found sessions are cached by token hash for ``SESSION_CACHE_TTL`` seconds
+    in a bounded LRU. State and expiration are checked on every call, so a
+    cached session still stops validating once it expires. An idle timeout
+    seen on a cached entry is checked again against the store, whose
+    ``last_activity_at`` may have been flushed since. Changes made by
+    this worker evict the entry right away; changes made by other workers
+    are picked up when it expires.
+    """
+
+    def __init__(self, maxsize=50000):
+        self._cache = LRUCache(maxsize=maxsize)
+
+    def _lookup(self, token_hash):
+        store = get_session_store()
+        if not store.cache_lookups:
+            return store.lookup(token_hash)
+        cached = self._cache.get(token_hash)
+        if cached is None:
+            cached = store.lookup(token_hash)
+            if cached is None:
+                return None
+            self._cache.put(token_hash, cached, ttl=current_app.config['SESSION_CACHE_TTL'])
+        return cached
+
+    def validate(self, token, now=None):
+        """Check a token and return ``(result, reason)``.
+
+        ``result`` holds the session id, user id and expiration; ``reason``
+        is None for a valid session and a short message otherwise.
+        """
+        now = now or datetime.utcnow()
+        token_hash = hash_token(token)
+        if signed_tokens.is_signed(token) and current_app.config['SESSION_TOKEN_MODE'] == 'signed':
+            return self._validate_signed(token, token_hash, now)
+        result, reason = self._check(self._lookup(token_hash), now)
+        if reason == _IDLE and get_session_store().cache_lookups:
+            # The cached last_activity_at predates any flush since it was read
+            self._cache.pop(token_hash)
+            result, reason = self._check(self._lookup(token_hash), now)
+        if reason is None:
+            activity_tracker.touch(result['session_id'], now)
+        return result, reason
+
+    def _check(self, found, now):
+        if found is None:
+            return None, "Session not found"
+        session_id, user_id, expiration, state, last_activity_at = found
+        result = {'session_id': session_id, 'user_id': user_id, 'expiration': expiration, 'state': state}
+        if state != 'active':
+            return result, "Session is not active"
+        if expiration <= now:
+            return result, "Session expired"
+        if self._idle(session_id, last_activity_at, now):
+            return result, _IDLE
+        return result, None
+
+    @staticmethod
+    def _idle(session_id, last_activity_at, now):
+        """Whether the session went unused for longer than ``SESSION_IDLE_TIMEOUT``"""
+        timeout = current_app.config['SESSION_IDLE_TIMEOUT']
+        if not timeout:
+            return False
+        seen = [at for at in (last_activity_at, activity_tracker.last_seen(session_id)) if at is not None]
+        return bool(seen) and (now - max(seen)).total_seconds() > timeout
+
+    @staticmethod
+    def _validate_signed(token, token_hash, now):
+        """Check the signature, expiry and revocation list; no session lookup"""
+        claims = signed_tokens.verify(token, current_app.config['SECRET_KEY'])
+        if claims is None:
+            return None, "Invalid token signature"
+        user_id, session_id, expiration = claims
+        result = {'session_id': session_id, 'user_id': user_id, 'expiration': expiration, 'state': 'active'}
+        if revocation_list.is_revoked(token_hash):
+            result['state'] = 'revoked'
+            return result, "Session is not active"
+        if expiration <= now:
+            return result, "Session expired"
+        activity_tracker.touch(session_id, now)
+        return result, None
+
+    def user_id_for(self, token):
+        """User owning an active, unexpired session with this token, or None"""
+        result, reason = self.validate(token)
+        return result['user_id'] if reason is None else None
+
+    def invalidate(self, *token_hashes):
+        for token_hash in token_hashes:
+            if token_hash:
+                self._cache.pop(token_hash)
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self):
+        return self._cache.stats()
+
+    @staticmethod
+    def backfill_hashes():
+        """Fill ``token_hash`` for sessions created before the column existed"""
+        sessions = Session.query.filter(Session.token_hash.is_(None)).all()
+        for session in sessions:
+            session.token_hash = hash_token(session.token)
+        if sessions:
+            db.session.commit()
+        return len(sessions)
+
+
+session_validator = SessionValidator()
@@ -0,0 +1,46 @@
+import base64
+import hashlib
+import hmac
+from datetime import datetime, timedelta
+
+# Prefix that tells signed tokens apart from opaque ones
+PREFIX = 's1.'
+EPOCH = datetime(1970, 1, 1)
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(value):
+    return base64.urlsafe_b64decode(value + '=' * (-len(value) % 4))
+
+
+def _signature(payload, secret):
+    return hmac.new(secret.encode('utf-8'), payload, hashlib.sha256).digest()
+
+
+def is_signed(token):
+    return token.startswith(PREFIX)
+
+
+def sign(user_id, session_id, expiration, secret):
+    """Token carrying the user id, session id and expiry (whole seconds, UTC), signed with HMAC-SHA256"""
+    expires = int((expiration - EPOCH).total_seconds())
+    payload = f"{user_id}:{session_id}:{expires}".encode('utf-8')
+    return PREFIX + _b64encode(payload) + '.' + _b64encode(_signature(payload, secret))
+
+
+def verify(token, secret):
+    """Return ``(user_id, session_id, expiration)`` if the signature is valid, else None"""
+    if not is_signed(token):
+        return None
+    try:
+        payload_part, signature_part = token[len(PREFIX):].split('.')
+        payload = _b64decode(payload_part)
+        if not hmac.compare_digest(_signature(payload, secret), _b64decode(signature_part)):
+            return None
+        user_id, session_id, expires = payload.decode('utf-8').split(':')
+        return int(user_id), session_id, EPOCH + timedelta(seconds=int(expires))
+    except ValueError:
+        return None
@@ -9,4 +9,111 @@ class Config:
         'sqlite:///' + os.path.join(basedir, 'app.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     UPLOAD_FOLDER = os.path.join(basedir, 'static', 'uploads')
-    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max upload
\ No newline at end of file
+    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max upload
+    # Bytes read at a time while an upload is hashed and written to disk
+    UPLOAD_CHUNK_SIZE = int(os.environ.get('UPLOAD_CHUNK_SIZE', 64 * 1024))
+
+    # Seconds between checks of the RBAC generation counters in each worker
+    RBAC_VERSION_CHECK_INTERVAL = float(os.environ.get('RBAC_VERSION_CHECK_INTERVAL', 1.0))
+
+    # Seconds between runs of the job that activates and expires
+    # user_effective_permissions rows at their startAt/endAt boundaries (0 disables it)
+    EFFECTIVE_PERMISSIONS_REFRESH_INTERVAL = float(os.environ.get('EFFECTIVE_PERMISSIONS_REFRESH_INTERVAL', 30))
+
+    # Permission enforcement on every request (opt-in). Callers authenticate with
+    # "Authorization: Bearer <session token>".
+    RBAC_ENFORCE = os.environ.get('RBAC_ENFORCE', 'false').lower() == 'true'
+    # Deny requests to endpoints that have no matching Permission row
+    RBAC_ENFORCE_UNMAPPED = os.environ.get('RBAC_ENFORCE_UNMAPPED', 'false').lower() == 'true'
+    RBAC_EXEMPT_BLUEPRINTS = {'authorization_bp'}
+    RBAC_EXEMPT_ENDPOINTS = {
+        'static', 'session_bp.validate_session', 'session_bp.verify_session_2fa', 'password_bp.verify_password',
+        'password_bp.verify_credentials'
+    }
+    # Seconds a cached decision stays valid
+    RBAC_DECISION_CACHE_TTL = float(os.environ.get('RBAC_DECISION_CACHE_TTL', 5))
+
+    # Session backend: 'sql' (sessions table) or 'memory' (process memory, single worker only)
+    SESSION_STORE = os.environ.get('SESSION_STORE', 'sql')
+    # 'opaque' issues random session tokens that are checked against the session
+    # store. 'signed' issues tokens carrying user id, session id and expiry, signed
+    # with SECRET_KEY (HMAC-SHA256), that are verified without a lookup.
+    SESSION_TOKEN_MODE = os.environ.get('SESSION_TOKEN_MODE', 'opaque')
+    # Seconds between reloads of the revoked signed-token set in each worker
+    SESSION_REVOCATION_REFRESH_INTERVAL = float(os.environ.get('SESSION_REVOCATION_REFRESH_INTERVAL', 5))
+    # Seconds a session looked up by token stays cached in each worker. Updates and
+    # deletes through the same worker evict it immediately.
+    SESSION_CACHE_TTL = float(os.environ.get('SESSION_CACHE_TTL', 30))
+
+    # Seconds between batched writes of sessions.last_activity_at, and seconds
+    # without activity after which a session stops validating (0 disables it)
+    SESSION_ACTIVITY_FLUSH_INTERVAL = float(os.environ.get('SESSION_ACTIVITY_FLUSH_INTERVAL', 10))
+    SESSION_IDLE_TIMEOUT = float(os.environ.get('SESSION_IDLE_TIMEOUT', 0))
+
+    # Seconds a session statistics snapshot is reused, users listed in it and
+    # hours of per-hour creation counts
+    SESSION_STATS_TTL = float(os.environ.get('SESSION_STATS_TTL', 15))
+    SESSION_STATS_TOP_USERS = int(os.environ.get('SESSION_STATS_TOP_USERS', 10))
+    SESSION_STATS_HOURS = int(os.environ.get('SESSION_STATS_HOURS', 24))
+
+    # Throttling of credential checks (2FA codes, logins): token buckets per user
+    # and per client IP, each allowing that many attempts per AUTH_RATE_LIMIT_PERIOD
+    # seconds. The 'sqlite' backend shares buckets between workers on one host.
+    AUTH_RATE_LIMIT_ATTEMPTS = int(os.environ.get('AUTH_RATE_LIMIT_ATTEMPTS', 5))
+    AUTH_RATE_LIMIT_IP_ATTEMPTS = int(os.environ.get('AUTH_RATE_LIMIT_IP_ATTEMPTS', 20))
+    AUTH_RATE_LIMIT_PERIOD = float(os.environ.get('AUTH_RATE_LIMIT_PERIOD', 60))
+    AUTH_RATE_LIMIT_BACKEND = os.environ.get('AUTH_RATE_LIMIT_BACKEND', 'memory')
+    AUTH_RATE_LIMIT_SQLITE_PATH = os.environ.get('AUTH_RATE_LIMIT_SQLITE_PATH') or \
+        os.path.join(basedir, 'rate_limits.db')
+
+    # Password hashing runs in a pool of PASSWORD_HASH_WORKERS processes (0 hashes
+    # in the request thread). At most PASSWORD_HASH_MAX_PENDING hashes are queued
+    # or running; requests wait PASSWORD_HASH_QUEUE_TIMEOUT seconds for a slot and
+    # PASSWORD_HASH_TIMEOUT seconds for the result before failing with 503.
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', min(4, os.cpu_count() or 1)))
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 32))
+    PASSWORD_HASH_QUEUE_TIMEOUT = float(os.environ.get('PASSWORD_HASH_QUEUE_TIMEOUT', 1))
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 5))
+
+    # werkzeug hash method for new passwords, e.g. 'pbkdf2:sha256:600000' (empty uses
+    # werkzeug's default). With PASSWORD_HASH_CALIBRATE=true it is measured once so one
+    # hash takes about PASSWORD_HASH_TARGET_MS, never below PASSWORD_HASH_MIN_ITERATIONS,
+    # and kept in PASSWORD_HASH_CALIBRATION_FILE for every later process. Stored hashes
+    # weaker than the method are re-hashed when they are verified.
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', '')
+    PASSWORD_HASH_CALIBRATE = os.environ.get('PASSWORD_HASH_CALIBRATE', 'false').lower() == 'true'
+    PASSWORD_HASH_TARGET_MS = float(os.environ.get('PASSWORD_HASH_TARGET_MS', 250))
+    PASSWORD_HASH_MIN_ITERATIONS = int(os.environ.get('PASSWORD_HASH_MIN_ITERATIONS', 600000))
+    PASSWORD_HASH_CALIBRATION_FILE = os.environ.get('PASSWORD_HASH_CALIBRATION_FILE') or \
+        os.path.join(basedir, 'password_hash_method')
+
+    # New passwords may not match any of the user's last PASSWORD_HISTORY_SIZE
+    # passwords (0 disables the check)
+    PASSWORD_HISTORY_SIZE = int(os.environ.get('PASSWORD_HISTORY_SIZE', 5))
+
+    # Sorted file of breached SHA-1 password hashes checked before a password is
+    # hashed (empty disables the check), optional Bloom filter built from it with
+    # 'flask build-breach-bloom', and bits per entry of that filter
+    PASSWORD_BREACH_LIST_PATH = os.environ.get('PASSWORD_BREACH_LIST_PATH', '')
+    PASSWORD_BREACH_BLOOM_PATH = os.environ.get('PASSWORD_BREACH_BLOOM_PATH', '')
+    PASSWORD_BREACH_BLOOM_BITS = int(os.environ.get('PASSWORD_BREACH_BLOOM_BITS', 10))
+
+    # Seconds between sweeps that move the active sessions of users whose password
+    # expired (Password.endAt passed, no newer current password) to 'password_expired'
+    # (0 disables it), and passwords read per batch
+    PASSWORD_EXPIRY_SWEEP_INTERVAL = float(os.environ.get('PASSWORD_EXPIRY_SWEEP_INTERVAL', 60))
+    PASSWORD_EXPIRY_SWEEP_BATCH_SIZE = int(os.environ.get('PASSWORD_EXPIRY_SWEEP_BATCH_SIZE', 500))
+
+    # Background deletion of expired and terminated sessions (interval 0 disables it).
+    # Sessions are removed once expired, or once in one of SESSION_REAPER_STATES,
+    # for longer than SESSION_REAPER_GRACE seconds.
+    SESSION_REAPER_INTERVAL = float(os.environ.get('SESSION_REAPER_INTERVAL', 300))
+    SESSION_REAPER_GRACE = float(os.environ.get('SESSION_REAPER_GRACE', 0))
+    SESSION_REAPER_STATES = [
+        state.strip() for state in os.environ.get('SESSION_REAPER_STATES', 'inactive,revoked,terminated').split(',')
+        if state.strip()
+    ]
+    # Rows deleted per statement, pause between statements and statements per run
+    SESSION_REAPER_BATCH_SIZE = int(os.environ.get('SESSION_REAPER_BATCH_SIZE', 500))
+    SESSION_REAPER_PAUSE = float(os.environ.get('SESSION_REAPER_PAUSE', 0.05))
+    SESSION_REAPER_MAX_BATCHES = int(os.environ.get('SESSION_REAPER_MAX_BATCHES', 200))
@@ -0,0 +1,35 @@
+from sqlalchemy import inspect, text
+from app.data.database import db
+
+
+def upgrade_schema():
+    """Add the columns and indexes declared by the models that existing tables lack.
+
+    ``db.create_all()`` only creates missing tables, so a database made by an
+    older version keeps its old columns and indexes. New columns are added
+    as nullable, without their Python-side defaults. Safe to run on every
+    start; returns the names of what was added.
+    """
+    engine = db.engine
+    quote = engine.dialect.identifier_preparer.quote
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    added = []
+    with engine.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            if table.name not in tables:
+                continue
+            columns = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in columns:
+                    connection.execute(text(
+                        f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} "
+                        f"{column.type.compile(dialect=engine.dialect)}"
+                    ))
+                    added.append(f"{table.name}.{column.name}")
+            indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in indexes:
+                    index.create(connection)
+                    added.append(index.name)
+    return added
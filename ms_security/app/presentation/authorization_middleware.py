@@ -0,0 +1,42 @@
+import time
+from flask import current_app, g, jsonify, request
+from app.business.services.permission_enforcer import authorization_metrics, decide, resolve_user_id
+
+
+def _bearer_token():
+    header = request.headers.get('Authorization', '')
+    if header.lower().startswith('bearer '):
+        return header[7:].strip() or None
+    return None
+
+
+def enforce_permissions():
+    """before_request hook: map the matched URL rule to a Permission and check it"""
+    config = current_app.config
+    if not config['RBAC_ENFORCE'] or request.method == 'OPTIONS' or request.url_rule is None:
+        return None
+    if request.blueprint in config['RBAC_EXEMPT_BLUEPRINTS'] or request.endpoint in config['RBAC_EXEMPT_ENDPOINTS']:
+        return None
+
+    started = time.perf_counter()
+    try:
+        authorization_metrics.incr('checks')
+        token = _bearer_token()
+        user_id = resolve_user_id(token) if token else None
+        if user_id is None:
+            authorization_metrics.incr('unauthenticated')
+            return jsonify({"error": "Authentication required"}), 401
+        g.user_id = user_id
+
+        permission_id, allowed = decide(user_id, request.url_rule.rule, request.method)
+        if permission_id is None:
+            authorization_metrics.incr('unmapped')
+            if not config['RBAC_ENFORCE_UNMAPPED']:
+                return None
+        if not allowed:
+            authorization_metrics.incr('denied')
+            return jsonify({"error": "Permission denied"}), 403
+        authorization_metrics.incr('allowed')
+        return None
+    finally:
+        authorization_metrics.observe('check', time.perf_counter() - started)
@@ -0,0 +1,32 @@
+import math
+from functools import wraps
+from flask import current_app, jsonify, request
+
+
+def rate_limited(scope, identity=None):
+    """Reject a view with 429 once its caller runs out of attempts.
+
+    Each request takes one token from the bucket of the client IP and, when
+    ``identity`` returns a value (by default the ``user_id`` URL argument),
+    from the bucket of that user. The check runs before the view, so a
+    throttled request never reaches the database or a password hash.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            config = current_app.config
+            limiter = current_app.extensions['rate_limiter']
+            period = config['AUTH_RATE_LIMIT_PERIOD']
+            checks = [(f"{scope}:ip:{request.remote_addr}", config['AUTH_RATE_LIMIT_IP_ATTEMPTS'])]
+            user = identity() if identity else kwargs.get('user_id')
+            if user is not None:
+                checks.append((f"{scope}:user:{user}", config['AUTH_RATE_LIMIT_ATTEMPTS']))
+            for key, attempts in checks:
+                allowed, retry_after = limiter.allow(key, attempts / period, attempts)
+                if not allowed:
+                    response = jsonify({"error": "Too many attempts, try again later"})
+                    response.headers['Retry-After'] = str(math.ceil(retry_after))
+                    return response, 429
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,48 @@
+from flask import Blueprint, request, jsonify
+from app.business.controllers.authorization_controller import AuthorizationController
+
+authorization_bp = Blueprint('authorization_bp', __name__)
+
+@authorization_bp.route('/', methods=['POST'])
+def authorize():
+    """Check a user's access to a URL and method"""
+    data = request.json
+    result, status_code = AuthorizationController.authorize(data)
+    return jsonify(result), status_code
+
+@authorization_bp.route('/batch', methods=['POST'])
+def authorize_batch():
+    """Check a user's access to many URL and method pairs at once"""
+    data = request.json
+    result, status_code = AuthorizationController.authorize_batch(data)
+    return jsonify(result), status_code
+
+@authorization_bp.route('/reload', methods=['POST'])
+def reload_authorization():
+    """Reload the authorization tables from the database"""
+    result, status_code = AuthorizationController.reload()
+    return jsonify(result), status_code
+
+@authorization_bp.route('/user/<int:user_id>/permissions', methods=['GET'])
+def get_user_permissions(user_id):
+    """Get the permissions a user currently holds"""
+    result, status_code = AuthorizationController.get_user_permissions(user_id)
+    return jsonify(result), status_code
+
+@authorization_bp.route('/user/<int:user_id>/permission/<int:permission_id>', methods=['GET'])
+def has_permission(user_id, permission_id):
+    """Check whether a user currently holds a permission"""
+    result, status_code = AuthorizationController.has_permission(user_id, permission_id)
+    return jsonify(result), status_code
+
+@authorization_bp.route('/user/<int:user_id>/permission-set', methods=['GET'])
+def get_user_permission_set(user_id):
+    """Get a user's effective permissions as a compact bitset"""
+    result, status_code = AuthorizationController.get_user_permission_set(user_id)
+    return jsonify(result), status_code
+
+@authorization_bp.route('/metrics', methods=['GET'])
+def get_authorization_metrics():
+    """Get permission enforcement latency and cache counters"""
+    result, status_code = AuthorizationController.get_metrics()
+    return jsonify(result), status_code
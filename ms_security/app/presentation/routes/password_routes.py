@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from app.business.controllers.password_controller import PasswordController
+from app.presentation.rate_limit import rate_limited
 
 password_bp = Blueprint('password_bp', __name__)
 
@@ -27,6 +28,22 @@ def get_current_password(user_id):
     result, status_code = PasswordController.get_current_password(user_id)
     return jsonify(result), status_code
 
+@password_bp.route('/verify', methods=['POST'])
+@rate_limited('password', identity=lambda: (request.get_json(silent=True) or {}).get('email'))
+def verify_credentials():
+    """Verify an email and password"""
+    data = request.json
+    result, status_code = PasswordController.verify_credentials(data)
+    return jsonify(result), status_code
+
+@password_bp.route('/user/<int:user_id>/verify', methods=['POST'])
+@rate_limited('password')
+def verify_password(user_id):
+    """Verify a user's current password"""
+    data = request.json
+    result, status_code = PasswordController.verify(user_id, data)
+    return jsonify(result), status_code
+
 @password_bp.route('/user/<int:user_id>', methods=['POST'])
 def create_password(user_id):
     """Create a new password for a user"""
@@ -45,4 +62,10 @@ def update_password(password_id):
 def delete_password(password_id):
     """Delete a password"""
     result, status_code = PasswordController.delete(password_id)
-    return jsonify(result), status_code
\ No newline at end of file
+    return jsonify(result), status_code
+
+@password_bp.route('/expiry-sweep', methods=['POST'])
+def sweep_expired_passwords():
+    """Flag the sessions of users whose password expired"""
+    result, status_code = PasswordController.sweep_expired()
+    return jsonify(result), status_code
@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, make_response
 from app.business.controllers.permission_controller import PermissionController
 
 permission_bp = Blueprint('permission_bp', __name__)
@@ -36,4 +36,15 @@ def delete_permission(permission_id):
     return jsonify(result), status_code
 @permission_bp.route('/grouped/role/<int:role_id>', methods=['GET'])
 def get_permissions_grouped(role_id):
-    return PermissionController.get_grouped_permissions(role_id)
\ No newline at end of file
+    """Get all permissions grouped by entity, flagged with whether the role has them"""
+    etag = PermissionController.get_grouped_permissions_etag(role_id)
+    if request.if_none_match.contains(etag):
+        response = make_response('', 304)
+    else:
+        result, status_code = PermissionController.get_grouped_permissions(role_id)
+        response = make_response(jsonify(result), status_code)
+        if status_code != 200:
+            return response
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
\ No newline at end of file
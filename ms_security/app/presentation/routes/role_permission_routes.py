@@ -36,6 +36,13 @@ def create_role_permission(role_id, permission_id):
     result, status_code = RolePermissionController.create(role_id, permission_id, data)
     return jsonify(result), status_code
 
+@role_permission_bp.route('/role/<int:role_id>', methods=['PUT'])
+def replace_role_permissions(role_id):
+    """Replace all permissions of a role with the given list of permission IDs"""
+    data = request.json
+    result, status_code = RolePermissionController.replace_for_role(role_id, data)
+    return jsonify(result), status_code
+
 @role_permission_bp.route('/<string:role_permission_id>', methods=['PUT'])
 def update_role_permission(role_permission_id):
     """Update a role-permission relationship"""
@@ -33,4 +33,23 @@ def update_role(role_id):
 def delete_role(role_id):
     """Delete a role"""
     result, status_code = RoleController.delete(role_id)
-    return jsonify(result), status_code
\ No newline at end of file
+    return jsonify(result), status_code
+
+@role_bp.route('/<int:role_id>/parent', methods=['PUT'])
+def set_role_parent(role_id):
+    """Set or clear the role this role inherits permissions from"""
+    data = request.json
+    result, status_code = RoleController.set_parent(role_id, data)
+    return jsonify(result), status_code
+
+@role_bp.route('/<int:role_id>/hierarchy', methods=['GET'])
+def get_role_hierarchy(role_id):
+    """Get a role's parent, ancestors and descendants"""
+    result, status_code = RoleController.get_hierarchy(role_id)
+    return jsonify(result), status_code
+
+@role_bp.route('/<int:role_id>/permissions', methods=['GET'])
+def get_role_permissions(role_id):
+    """Get all permissions of a role, including inherited ones"""
+    result, status_code = RoleController.get_permissions(role_id)
+    return jsonify(result), status_code
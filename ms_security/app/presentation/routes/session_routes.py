@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from app.business.controllers.session_controller import SessionController
+from app.presentation.rate_limit import rate_limited
 
 session_bp = Blueprint('session_bp', __name__)
 
@@ -9,6 +10,12 @@ def get_all_sessions():
     result, status_code = SessionController.get_all()
     return jsonify(result), status_code
 
+@session_bp.route('/stats', methods=['GET'])
+def get_session_stats():
+    """Get aggregated session counts"""
+    result, status_code = SessionController.get_stats()
+    return jsonify(result), status_code
+
 @session_bp.route('/<string:session_id>', methods=['GET'])
 def get_session(session_id):
     """Get a specific session by ID"""
@@ -21,6 +28,34 @@ def get_sessions_by_user(user_id):
     result, status_code = SessionController.get_by_user_id(user_id)
     return jsonify(result), status_code
 
+@session_bp.route('/validate', methods=['POST'])
+def validate_session():
+    """Validate a session token"""
+    data = request.json
+    result, status_code = SessionController.validate(data)
+    return jsonify(result), status_code
+
+@session_bp.route('/user/<int:user_id>/verify-2fa', methods=['POST'])
+@rate_limited('2fa')
+def verify_session_2fa(user_id):
+    """Verify the 2FA code of a user's session"""
+    data = request.json
+    result, status_code = SessionController.verify_2fa(user_id, data)
+    return jsonify(result), status_code
+
+@session_bp.route('/state', methods=['PUT'])
+def set_sessions_state():
+    """Change the state of all sessions matching a filter"""
+    data = request.json
+    result, status_code = SessionController.set_state(data)
+    return jsonify(result), status_code
+
+@session_bp.route('/user/<int:user_id>/revoke', methods=['POST'])
+def revoke_user_sessions(user_id):
+    """End all active sessions of a user"""
+    result, status_code = SessionController.revoke_user_sessions(user_id)
+    return jsonify(result), status_code
+
 @session_bp.route('/user/<int:user_id>', methods=['POST'])
 def create_session(user_id):
     """Create a new session for a user"""
@@ -39,4 +74,16 @@ def update_session(session_id):
 def delete_session(session_id):
     """Delete a session"""
     result, status_code = SessionController.delete(session_id)
-    return jsonify(result), status_code
\ No newline at end of file
+    return jsonify(result), status_code
+
+@session_bp.route('/reaper/metrics', methods=['GET'])
+def get_reaper_metrics():
+    """Get session reaper metrics"""
+    result, status_code = SessionController.get_reaper_metrics()
+    return jsonify(result), status_code
+
+@session_bp.route('/reaper/run', methods=['POST'])
+def run_reaper():
+    """Delete expired and terminated sessions now"""
+    result, status_code = SessionController.reap()
+    return jsonify(result), status_code
@@ -0,0 +1,80 @@
+"""Compare the permission route trie with linear template matching.
+
+Usage (from ms_security/):
+    python -m benchmarks.route_matching_benchmark [permissions] [lookups]
+"""
+import random
+import sys
+import time
+
+from app.business.services.route_trie import RouteTrie, WILDCARD
+
+METHODS = ('GET', 'POST', 'PUT', 'DELETE')
+
+
+def build_templates(count, seed=42):
+    """Generate REST-like templates such as /entity17/?/sub3"""
+    rng = random.Random(seed)
+    templates = set()
+    while len(templates) < count:
+        entity = f"entity{rng.randrange(count // 4 or 1)}"
+        shape = rng.randrange(4)
+        if shape == 0:
+            segments = (entity,)
+        elif shape == 1:
+            segments = (entity, WILDCARD)
+        elif shape == 2:
+            segments = (entity, WILDCARD, f"sub{rng.randrange(10)}")
+        else:
+            segments = (entity, WILDCARD, f"sub{rng.randrange(10)}", WILDCARD)
+        templates.add((segments, rng.choice(METHODS)))
+    return [(segments, method, permission_id) for permission_id, (segments, method) in enumerate(sorted(templates), 1)]
+
+
+def concrete_paths(templates, count, seed=7):
+    rng = random.Random(seed)
+    paths = []
+    for _ in range(count):
+        segments, method, _ = rng.choice(templates)
+        paths.append((tuple(str(rng.randrange(1, 10**6)) if s == WILDCARD else s for s in segments), method))
+    return paths
+
+
+def linear_match(templates, segments, method):
+    for template, template_method, permission_id in templates:
+        if template_method == method and len(template) == len(segments) and all(
+                t == WILDCARD or t == s for t, s in zip(template, segments)):
+            return permission_id
+    return None
+
+
+def run(permissions=10000, lookups=2000):
+    templates = build_templates(permissions)
+    # Linear matching tries the most specific templates first
+    ordered = sorted(templates, key=lambda t: (t[0].count(WILDCARD), t[2]))
+    trie = RouteTrie()
+    started = time.perf_counter()
+    for segments, method, permission_id in templates:
+        trie.insert(segments, method, permission_id)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    paths = concrete_paths(templates, lookups)
+
+    started = time.perf_counter()
+    linear_results = [linear_match(ordered, segments, method) for segments, method in paths]
+    linear_us = (time.perf_counter() - started) / lookups * 1e6
+
+    started = time.perf_counter()
+    trie_results = [trie.match(segments, method) for segments, method in paths]
+    trie_us = (time.perf_counter() - started) / lookups * 1e6
+
+    mismatches = sum(1 for a, b in zip(linear_results, trie_results) if a != b)
+    print(f"permissions: {permissions}, lookups: {lookups}")
+    print(f"trie build:  {build_ms:.1f} ms")
+    print(f"linear:      {linear_us:.2f} us/lookup")
+    print(f"trie:        {trie_us:.2f} us/lookup ({linear_us / trie_us:.0f}x faster)")
+    print(f"lookups resolved to different permissions: {mismatches}")
+
+
+if __name__ == '__main__':
+    run(*(int(arg) for arg in sys.argv[1:3]))
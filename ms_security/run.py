@@ -1,6 +1,9 @@
 from app import create_app
 
-app = create_app()
+# Los procesos del pool de hash de contraseñas importan este módulo como
+# '__mp_main__'; no deben crear otra aplicación
+if __name__ != '__mp_main__':
+    app = create_app()
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=True)
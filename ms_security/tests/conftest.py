@@ -0,0 +1,37 @@
+import pytest
+from app import create_app
+from app.config import Config
+from app.data.database import db
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    PASSWORD_HASH_WORKERS = 0
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'
+    # No background threads during tests
+    RBAC_VERSION_CHECK_INTERVAL = 0
+    EFFECTIVE_PERMISSIONS_REFRESH_INTERVAL = 0
+    SESSION_REVOCATION_REFRESH_INTERVAL = 0
+    SESSION_ACTIVITY_FLUSH_INTERVAL = 0
+    PASSWORD_EXPIRY_SWEEP_INTERVAL = 0
+    SESSION_REAPER_INTERVAL = 0
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """Build an app with extra config values; its context is pushed until the test ends"""
+    contexts = []
+
+    def make(**config):
+        config.setdefault('UPLOAD_FOLDER', str(tmp_path / 'uploads'))
+        app = create_app(type('Config', (TestConfig,), config))
+        context = app.app_context()
+        context.push()
+        contexts.append(context)
+        return app
+
+    yield make
+    for context in reversed(contexts):
+        db.session.remove()
+        context.pop()
@@ -0,0 +1,78 @@
+import io
+import os
+import pytest
+from werkzeug.datastructures import FileStorage
+from app.data.database import db
+from app.business.models.blob import Blob
+from app.business.services.blob_store import blob_store
+
+
+@pytest.fixture
+def client(make_app):
+    app = make_app()
+    client = app.test_client()
+    client.upload_folder = app.config['UPLOAD_FOLDER']
+    return client
+
+
+def upload(client, url, content, method='post', **data):
+    data['photo'] = (io.BytesIO(content), 'photo.png')
+    return getattr(client, method)(url, data=data, content_type='multipart/form-data').json
+
+
+def stored_files(client, folder):
+    directory = os.path.join(client.upload_folder, folder)
+    return sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+
+
+def test_identical_uploads_share_one_file(client):
+    users = [client.post('/api/users/', json={'name': n, 'email': f"{n}@example.com"}).json for n in 'ab']
+    first = upload(client, f"/api/profiles/user/{users[0]['id']}", b'same bytes', phone='1')
+    second = upload(client, f"/api/profiles/user/{users[1]['id']}", b'same bytes', phone='2')
+
+    assert first['photo'] == second['photo'] and first['photo_hash'] == second['photo_hash']
+    assert stored_files(client, 'profiles') == [first['photo_hash']]
+    assert db.session.get(Blob, first['photo']).ref_count == 2
+
+    client.delete(f"/api/profiles/{first['id']}")
+    assert stored_files(client, 'profiles') == [first['photo_hash']]
+    client.delete(f"/api/profiles/{second['id']}")
+    assert stored_files(client, 'profiles') == []
+    assert Blob.query.count() == 0
+
+
+def test_deleting_a_user_releases_profile_and_signature_files(client):
+    user = client.post('/api/users/', json={'name': 'a', 'email': 'a@example.com'}).json
+    upload(client, f"/api/profiles/user/{user['id']}", b'photo', phone='1')
+    upload(client, f"/api/digital-signatures/user/{user['id']}", b'signature')
+
+    assert client.delete(f"/api/users/{user['id']}").status_code == 200
+
+    assert stored_files(client, 'profiles') == [] and stored_files(client, 'digital-signatures') == []
+    assert Blob.query.count() == 0
+
+
+def test_files_are_kept_when_the_release_is_rolled_back(client):
+    user = client.post('/api/users/', json={'name': 'a', 'email': 'a@example.com'}).json
+    profile = upload(client, f"/api/profiles/user/{user['id']}", b'photo', phone='1')
+
+    blob_store.release(profile['photo'])
+    db.session.rollback()
+    db.session.commit()
+
+    assert stored_files(client, 'profiles') == [profile['photo_hash']]
+    assert db.session.get(Blob, profile['photo']).ref_count == 1
+
+
+
+def test_files_uploaded_again_before_the_commit_are_kept(client):
+    user = client.post('/api/users/', json={'name': 'a', 'email': 'a@example.com'}).json
+    profile = upload(client, f"/api/profiles/user/{user['id']}", b'photo', phone='1')
+
+    # The last reference goes, then the same content is stored again before the commit
+    blob_store.release(profile['photo'])
+    blob_store.store(FileStorage(io.BytesIO(b'photo'), 'photo.png'), 'profiles')
+    db.session.commit()
+
+    assert stored_files(client, 'profiles') == [profile['photo_hash']]
+    assert db.session.get(Blob, profile['photo']).ref_count == 1
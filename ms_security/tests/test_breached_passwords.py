@@ -0,0 +1,75 @@
+import pytest
+from app.business.services.breached_passwords import BreachedPasswordList, build_bloom, sha1_hex
+
+BREACHED = sorted(sha1_hex(f'breached-{i}') for i in range(200))
+
+
+def write_list(path, digests, line_end='\n', counts=True):
+    path.write_bytes(''.join(
+        f'{digest}:{i + 1}{line_end}' if counts else f'{digest}{line_end}' for i, digest in enumerate(digests)
+    ).encode('ascii'))
+    return str(path)
+
+
+@pytest.mark.parametrize('line_end', ['\n', '\r\n'])
+@pytest.mark.parametrize('counts', [True, False])
+def test_contains_every_listed_digest(tmp_path, line_end, counts):
+    breached = BreachedPasswordList(write_list(tmp_path / 'list.txt', BREACHED, line_end, counts))
+    try:
+        assert breached.contains(BREACHED[0]) and breached.contains(BREACHED[-1])
+        assert all(breached.contains(digest) for digest in BREACHED)
+        assert breached.is_breached('breached-7')
+        assert not breached.is_breached('not-breached')
+        # Before the first and after the last line
+        assert not breached.contains('0' * 40) and not breached.contains('F' * 40)
+    finally:
+        breached.close()
+
+
+def test_unterminated_last_line(tmp_path):
+    path = tmp_path / 'list.txt'
+    path.write_bytes('\n'.join(BREACHED[:3]).encode('ascii'))
+    breached = BreachedPasswordList(str(path))
+    try:
+        assert all(breached.contains(digest) for digest in BREACHED[:3])
+    finally:
+        breached.close()
+
+
+def test_empty_list(tmp_path):
+    path = tmp_path / 'list.txt'
+    path.write_bytes(b'')
+    breached = BreachedPasswordList(str(path))
+    assert not breached.is_breached('anything')
+    breached.close()
+
+
+def test_bloom_filter_has_no_false_negatives(tmp_path):
+    list_path = write_list(tmp_path / 'list.txt', BREACHED)
+    bloom = build_bloom(list_path, 10)
+    bloom.save(str(tmp_path / 'list.bloom'))
+    bloom = type(bloom).load(str(tmp_path / 'list.bloom'))
+
+    breached = BreachedPasswordList(list_path, bloom)
+    try:
+        assert all(breached.contains(digest) for digest in BREACHED)
+        absent = [sha1_hex(f'absent-{i}') for i in range(2000)]
+        assert not any(breached.contains(digest) for digest in absent)
+        # About 1% false positives at 10 bits per entry
+        assert sum(bytes.fromhex(digest) in bloom for digest in absent) < 100
+    finally:
+        breached.close()
+
+
+def test_breached_passwords_are_rejected(make_app, tmp_path):
+    client = make_app(PASSWORD_BREACH_LIST_PATH=write_list(tmp_path / 'list.txt', BREACHED)).test_client()
+    user = client.post('/api/users/', json={'name': 'a', 'email': 'a@example.com'}).json
+    url = f"/api/passwords/user/{user['id']}"
+    window = {'startAt': '2024-01-01 00:00:00', 'endAt': '2099-01-01 00:00:00'}
+
+    assert client.post(url, json=dict(window, content='breached-3')).status_code == 400
+    response = client.post(url, json=dict(window, content='fine-password'))
+    assert response.status_code == 201
+    assert client.post(url, json=dict(window, content=123)).status_code == 400
+    assert client.put(f"/api/passwords/{response.json['id']}", json={'content': 123}).status_code == 400
+    assert client.put(f"/api/passwords/{response.json['id']}", json={'content': 'breached-4'}).status_code == 400
@@ -0,0 +1,38 @@
+from app.business.services.password_expiry import password_expiry_sweep
+
+
+def create_password(client, user_id, content, end_at):
+    return client.post(f"/api/passwords/user/{user_id}", json={
+        'content': content, 'startAt': '2020-01-01 00:00:00', 'endAt': end_at}).json
+
+
+def test_sweep_flags_sessions_of_users_without_a_current_password(make_app):
+    client = make_app().test_client()
+    expired = client.post('/api/users/', json={'name': 'a', 'email': 'a@example.com'}).json
+    renewed = client.post('/api/users/', json={'name': 'b', 'email': 'b@example.com'}).json
+    create_password(client, expired['id'], 'old-a', '2021-01-01 00:00:00')
+    create_password(client, renewed['id'], 'old-b', '2021-01-01 00:00:00')
+    create_password(client, renewed['id'], 'new-b', '2099-01-01 00:00:00')
+    session_a = client.post(f"/api/sessions/user/{expired['id']}", json={}).json
+    session_b = client.post(f"/api/sessions/user/{renewed['id']}", json={}).json
+
+    assert password_expiry_sweep.sweep() == {'passwords': 2, 'sessions': 1}
+    assert client.get(f"/api/sessions/{session_a['id']}").json['state'] == 'password_expired'
+    assert client.get(f"/api/sessions/{session_b['id']}").json['state'] == 'active'
+    assert password_expiry_sweep.sweep() == {'passwords': 0, 'sessions': 0}
+
+
+def test_backdated_expiry_is_swept(make_app):
+    client = make_app().test_client()
+    user = client.post('/api/users/', json={'name': 'a', 'email': 'a@example.com'}).json
+    other = client.post('/api/users/', json={'name': 'b', 'email': 'b@example.com'}).json
+    create_password(client, other['id'], 'recent', '2024-01-01 00:00:00')
+    password = create_password(client, user['id'], 'current', '2099-01-01 00:00:00')
+    session = client.post(f"/api/sessions/user/{user['id']}", json={}).json
+    password_expiry_sweep.sweep()
+
+    # Expires before the password swept above
+    client.put(f"/api/passwords/{password['id']}", json={'endAt': '2022-01-01 00:00:00'})
+
+    assert password_expiry_sweep.sweep()['sessions'] == 1
+    assert client.get(f"/api/sessions/{session['id']}").json['state'] == 'password_expired'
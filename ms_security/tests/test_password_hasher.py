@@ -0,0 +1,75 @@
+import os
+import signal
+import pytest
+from werkzeug.security import generate_password_hash
+from app.business.services import password_hasher as password_hasher_module
+from app.business.services.password_hasher import password_hasher, HashingBusyError, calibrated_method, needs_rehash
+
+# Valid hashes that take a second or more to check
+SLOW_HASHES = [f'pbkdf2:sha256:3000000$salt{i}$00' for i in range(10)]
+
+
+@pytest.fixture
+def pooled(make_app):
+    make_app(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_TIMEOUT=30)
+    yield password_hasher
+    password_hasher.shutdown()
+
+
+def test_pool_is_rebuilt_after_a_worker_dies(pooled):
+    os.kill(pooled.submit(os.getpid), signal.SIGKILL)
+
+    with pytest.raises(HashingBusyError):
+        pooled.hash('secret')
+
+    assert pooled.verify(pooled.hash('secret'), 'secret')
+
+
+def test_matches_any_stops_at_the_first_match(make_app, monkeypatch):
+    make_app()
+    checked = []
+    check = password_hasher_module.check_password_hash
+    monkeypatch.setattr(password_hasher_module, 'check_password_hash',
+                        lambda password_hash, password: checked.append(password_hash) or check(password_hash, password))
+    hashes = [generate_password_hash('other', 'pbkdf2:sha256:1000'), generate_password_hash('secret', 'pbkdf2:sha256:1000')]
+
+    assert password_hasher.matches_any('secret', hashes + SLOW_HASHES)
+    assert checked == hashes
+    assert not password_hasher.matches_any('secret', hashes[:1])
+    assert not password_hasher.matches_any('secret', [])
+
+
+def test_matches_any_cancels_pending_checks(pooled, monkeypatch):
+    futures = []
+    submit = pooled._submit
+
+    def recording_submit(*args):
+        executor, future = submit(*args)
+        futures.append(future)
+        return executor, future
+    monkeypatch.setattr(pooled, '_submit', recording_submit)
+
+    assert pooled.matches_any('secret', [generate_password_hash('secret', 'pbkdf2:sha256:1000')] + SLOW_HASHES)
+    # With one worker, one slow check runs and the pool's call queue holds two more
+    assert sum(future.cancelled() for future in futures) >= len(SLOW_HASHES) - 3
+
+
+def test_needs_rehash_accepts_stronger_pbkdf2_hashes():
+    method = 'pbkdf2:sha256:600000'
+
+    assert not needs_rehash('pbkdf2:sha256:600000$salt$hash', method)
+    assert not needs_rehash('pbkdf2:sha256:640000$salt$hash', method)
+    assert needs_rehash('pbkdf2:sha256:470000$salt$hash', method)
+    assert needs_rehash('pbkdf2:sha1:900000$salt$hash', method)
+    assert needs_rehash('scrypt:32768:8:1$salt$hash', method)
+    assert not needs_rehash('scrypt:32768:8:1$salt$hash', '')
+
+
+def test_calibration_is_stored_and_reused(tmp_path):
+    path = str(tmp_path / 'password_hash_method')
+
+    method = calibrated_method(path, 0.001, 1000)
+
+    assert method.startswith('pbkdf2:sha256:')
+    assert calibrated_method(path, 10, 1000) == method
+    assert list(tmp_path.iterdir()) == [tmp_path / 'password_hash_method']
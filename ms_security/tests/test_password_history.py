@@ -0,0 +1,27 @@
+def create_password(client, user_id, content, day):
+    return client.post(f'/api/passwords/user/{user_id}', json={
+        'content': content, 'startAt': f'2024-01-{day:02d} 00:00:00', 'endAt': '2099-01-01 00:00:00'
+    })
+
+
+def test_recent_passwords_cannot_be_reused(make_app):
+    client = make_app(PASSWORD_HISTORY_SIZE=2).test_client()
+    user = client.post('/api/users/', json={'name': 'a', 'email': 'a@example.com'}).json
+    for day, content in enumerate(['first-secret', 'second-secret', 'third-secret'], 1):
+        assert create_password(client, user['id'], content, day).status_code == 201
+
+    response = create_password(client, user['id'], 'second-secret', 4)
+    assert response.status_code == 400
+    assert 'used recently' in response.json['error']
+    # Older than the last PASSWORD_HISTORY_SIZE passwords
+    assert create_password(client, user['id'], 'first-secret', 5).status_code == 201
+
+    password = client.get(f"/api/passwords/user/{user['id']}").json[0]
+    assert client.put(f"/api/passwords/{password['id']}", json={'content': 'first-secret'}).status_code == 400
+
+
+def test_history_check_can_be_disabled(make_app):
+    client = make_app(PASSWORD_HISTORY_SIZE=0).test_client()
+    user = client.post('/api/users/', json={'name': 'a', 'email': 'a@example.com'}).json
+    assert create_password(client, user['id'], 'same-secret', 1).status_code == 201
+    assert create_password(client, user['id'], 'same-secret', 2).status_code == 201
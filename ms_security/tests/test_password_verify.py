@@ -0,0 +1,68 @@
+import pytest
+from app.business.models.password import Password
+from app.business.services.password_hasher import password_hasher
+
+
+@pytest.fixture
+def client(make_app):
+    return make_app(AUTH_RATE_LIMIT_ATTEMPTS=100, AUTH_RATE_LIMIT_IP_ATTEMPTS=100).test_client()
+
+
+@pytest.fixture
+def user(client):
+    user = client.post('/api/users/', json={'name': 'a', 'email': 'a@example.com'}).json
+    client.post(f"/api/passwords/user/{user['id']}", json={
+        'content': 'correct-horse', 'startAt': '2024-01-01 00:00:00', 'endAt': '2099-01-01 00:00:00'
+    })
+    return user
+
+
+def test_verify_by_user_id(client, user):
+    url = f"/api/passwords/user/{user['id']}/verify"
+    response = client.post(url, json={'content': 'correct-horse'})
+    assert (response.status_code, response.json) == (200, {'valid': True, 'user_id': user['id']})
+    assert client.post(url, json={'content': 'wrong'}).status_code == 401
+    assert client.post(url, json={'content': 123}).status_code == 400
+    assert client.post(url, json={}).status_code == 400
+
+
+def test_verify_credentials(client, user):
+    url = '/api/passwords/verify'
+    response = client.post(url, json={'email': 'a@example.com', 'content': 'correct-horse'})
+    assert (response.status_code, response.json) == (200, {'valid': True, 'user_id': user['id']})
+    assert client.post(url, json={'email': 'a@example.com', 'content': 'wrong'}).status_code == 401
+    assert client.post(url, json={'email': 'a@example.com', 'content': 123}).status_code == 400
+    assert client.post(url, json={'email': ['a@example.com'], 'content': 'x'}).status_code == 400
+
+
+def test_unknown_accounts_still_cost_a_hash_check(client, user, monkeypatch):
+    checked = []
+    verify = password_hasher.verify
+    monkeypatch.setattr(password_hasher, 'verify', lambda *args: checked.append(args[0]) or verify(*args))
+
+    response = client.post('/api/passwords/verify', json={'email': 'nobody@example.com', 'content': 'correct-horse'})
+    assert response.status_code == 401
+    response = client.post('/api/passwords/user/999/verify', json={'content': 'correct-horse'})
+    assert response.status_code == 401
+    # The same dummy hash, with the configured cost
+    assert len(checked) == 2 and checked[0] == checked[1]
+    assert checked[0].startswith(client.application.config['PASSWORD_HASH_METHOD'] + '$')
+
+
+def test_outdated_hashes_are_upgraded_on_verify(client, user):
+    url = f"/api/passwords/user/{user['id']}/verify"
+    assert Password.query.one().content.startswith('pbkdf2:sha256:1000$')
+
+    client.application.config['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:2000'
+    # A failed check leaves the hash alone
+    assert client.post(url, json={'content': 'wrong'}).status_code == 401
+    assert Password.query.one().content.startswith('pbkdf2:sha256:1000$')
+
+    assert client.post(url, json={'content': 'correct-horse'}).status_code == 200
+    upgraded = Password.query.one().content
+    assert upgraded.startswith('pbkdf2:sha256:2000$')
+
+    # Stronger than the configured method: kept
+    client.application.config['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:1000'
+    assert client.post(url, json={'content': 'correct-horse'}).status_code == 200
+    assert Password.query.one().content == upgraded
@@ -0,0 +1,80 @@
+import pytest
+from app.business.services import rate_limiter
+from app.business.services.rate_limiter import TokenBucketLimiter, SQLiteTokenBucketLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, 'time', clock)
+    return clock
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def limiter(request, tmp_path, clock):
+    if request.param == 'memory':
+        return TokenBucketLimiter()
+    return SQLiteTokenBucketLimiter(str(tmp_path / 'buckets.db'))
+
+
+def test_bucket_refills_at_its_rate(limiter, clock):
+    assert limiter.allow('k', rate=1, burst=2) == (True, 0.0)
+    assert limiter.allow('k', rate=1, burst=2) == (True, 0.0)
+    assert limiter.allow('k', rate=1, burst=2) == (False, 1.0)
+
+    clock.now += 0.5
+    assert limiter.allow('k', rate=1, burst=2) == (False, 0.5)
+    clock.now += 0.5
+    assert limiter.allow('k', rate=1, burst=2) == (True, 0.0)
+    # Refill stops at the burst size
+    clock.now += 60
+    assert [limiter.allow('k', rate=1, burst=2)[0] for _ in range(3)] == [True, True, False]
+
+    assert limiter.stats()['throttled'] == 3
+    # Other keys are independent
+    assert limiter.allow('other', rate=1, burst=2) == (True, 0.0)
+
+
+def test_reset_refills_the_bucket(limiter):
+    limiter.allow('k', rate=1, burst=1)
+    assert not limiter.allow('k', rate=1, burst=1)[0]
+    limiter.reset('k')
+    assert limiter.allow('k', rate=1, burst=1)[0]
+
+
+def test_memory_buckets_are_capped_per_shard(clock):
+    limiter = TokenBucketLimiter(shards=1, max_keys_per_shard=2)
+    # An empty IP bucket with a slow refill
+    for _ in range(3):
+        limiter.allow('ip', rate=0.01, burst=2)
+    limiter.allow('user:1', rate=100, burst=1)
+    limiter.allow('ip', rate=0.01, burst=2)
+    # Over the cap: the least recently used bucket goes, whatever its limits
+    limiter.allow('user:2', rate=100, burst=1)
+
+    assert limiter.stats()['keys'] == 2
+    assert limiter.allow('ip', rate=0.01, burst=2)[0] is False
+    assert limiter.allow('user:1', rate=100, burst=1)[0] is True
+
+
+def test_throttled_requests_get_retry_after(make_app):
+    client = make_app(AUTH_RATE_LIMIT_ATTEMPTS=2, AUTH_RATE_LIMIT_PERIOD=60).test_client()
+    url = '/api/sessions/user/1/verify-2fa'
+    assert [client.post(url, json={}).status_code for _ in range(2)] == [400, 400]
+
+    response = client.post(url, json={})
+    assert response.status_code == 429
+    assert 1 <= int(response.headers['Retry-After']) <= 30
+    # The IP bucket is separate from the user bucket
+    assert client.post('/api/sessions/user/2/verify-2fa', json={}).status_code == 400
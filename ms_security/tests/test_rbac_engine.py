@@ -0,0 +1,179 @@
+from datetime import datetime
+import pytest
+from app.data.database import db
+from app.business.models.role import Role
+from app.business.models.rbac_version import RBACVersion
+from app.business.services.effective_permissions import EffectivePermissionService
+from app.business.services.rbac_engine import rbac_engine, normalize_url
+from app.business.services.route_trie import RouteTrie, WILDCARD
+from benchmarks.route_matching_benchmark import build_templates, concrete_paths, linear_match
+
+
+@pytest.fixture
+def client(make_app):
+    app = make_app(RBAC_VERSION_CHECK_INTERVAL=3600)
+    # The engine is process-wide; start each test from this app's tables
+    rbac_engine.load()
+    return app.test_client()
+
+
+def seed(client, start='2020-01-01 00:00:00', end='2099-01-01 00:00:00'):
+    user = client.post('/api/users/', json={'name': 'a', 'email': 'a@example.com'}).json
+    role = client.post('/api/roles/', json={'name': 'admin'}).json
+    one = client.post('/api/permissions/', json={'url': '/users/?', 'method': 'GET', 'entity': 'Users'}).json
+    many = client.post('/api/permissions/', json={'url': '/users', 'method': 'GET', 'entity': 'Users'}).json
+    for permission in (one, many):
+        client.post(f"/api/role-permissions/role/{role['id']}/permission/{permission['id']}", json={})
+    client.post(f"/api/user-roles/user/{user['id']}/role/{role['id']}", json={'startAt': start, 'endAt': end})
+    return user, role, one, many
+
+
+def test_normalize_url_treats_placeholders_alike():
+    assert normalize_url('/api/users/<int:user_id>/') == ('users', WILDCARD)
+    assert normalize_url('/users/?') == ('users', WILDCARD)
+    assert normalize_url('/users/:id?active=1') == ('users', WILDCARD)
+
+
+def test_authorize_and_authorize_many(client):
+    user, role, one, many = seed(client)
+
+    decision = client.post('/api/authorize/', json={'user_id': user['id'], 'url': '/api/users/5', 'method': 'get'}).json
+    assert decision == {'allowed': True, 'permission_id': one['id'], 'roles': ['admin']}
+    decision = client.post('/api/authorize/', json={'user_id': user['id'], 'url': '/api/users/5', 'method': 'DELETE'}).json
+    assert decision == {'allowed': False, 'permission_id': None, 'roles': []}
+    # Outside the UserRole window
+    assert not rbac_engine.authorize(user['id'], '/users/5', 'GET', now=datetime(2099, 6, 1))['allowed']
+
+    response = client.post('/api/authorize/batch', json={'user_id': user['id'], 'checks': [
+        {'url': '/users', 'method': 'GET'}, ['/users/7', 'GET'], ['/users', 'POST']
+    ]})
+    assert response.json['results'] == [True, True, False]
+    assert rbac_engine.authorize_many(user['id'], [('/users', 'GET')], now=datetime(2010, 1, 1)) == [False]
+
+
+@pytest.mark.parametrize('user_id', ['1', 1.0, True, None])
+def test_authorize_rejects_non_integer_user_id(client, user_id):
+    response = client.post('/api/authorize/', json={'user_id': user_id, 'url': '/users', 'method': 'GET'})
+    assert response.status_code == 400
+    response = client.post('/api/authorize/batch', json={'user_id': user_id, 'checks': [['/users', 'GET']]})
+    assert response.status_code == 400
+
+
+def test_refresh_rebuilds_only_changed_scopes(client):
+    generation = rbac_engine.generation
+    db.session.add(Role(name='auditor', description=''))
+    RBACVersion.bump('roles')
+    db.session.commit()
+
+    assert rbac_engine.refresh() == {'roles'}
+    assert 'auditor' in rbac_engine._tables.roles.values()
+    assert rbac_engine.generation == generation + 1
+    assert rbac_engine.refresh() == set()
+    assert rbac_engine.generation == generation + 1
+
+
+def test_local_permission_change_is_applied_in_place(client):
+    created = client.post('/api/permissions/', json={'url': '/roles', 'method': 'GET', 'entity': 'Roles'}).json
+    # Our own change: indexed without waiting for a version check
+    assert rbac_engine._checked_at != 0
+    assert rbac_engine._versions['permissions'] == RBACVersion.current()['permissions']
+    assert rbac_engine.resolve_rule('/api/roles/', 'GET') == created['id']
+
+    client.delete(f"/api/permissions/{created['id']}")
+    assert rbac_engine.resolve_rule('/api/roles/', 'GET') is None
+    rbac_engine.refresh()
+    assert rbac_engine._checked_at != 0
+
+    # Another worker changed the permissions too: reload instead of applying in place
+    RBACVersion.bump('permissions')
+    db.session.commit()
+    created = client.post('/api/permissions/', json={'url': '/roles', 'method': 'GET', 'entity': 'Roles'}).json
+    assert rbac_engine._checked_at == 0
+    assert rbac_engine.versions() == RBACVersion.current()
+    assert rbac_engine.resolve_rule('/api/roles/', 'GET') == created['id']
+
+
+def test_effective_permissions_follow_time_windows(client):
+    user, role, one, _ = seed(client, start='2099-01-01 00:00:00', end='2100-01-01 00:00:00')
+    url = f"/api/authorize/user/{user['id']}/permission/{one['id']}"
+    assert client.get(url).json['allowed'] is False
+
+    assert EffectivePermissionService.refresh_windows(now=datetime(2099, 6, 1)) == {'activated': 2, 'expired': 0}
+    assert client.get(url).json['allowed'] is True
+    assert len(client.get(f"/api/authorize/user/{user['id']}/permissions").json) == 2
+
+    assert EffectivePermissionService.refresh_windows(now=datetime(2100, 6, 1)) == {'activated': 0, 'expired': 2}
+    assert client.get(url).json['allowed'] is False
+
+
+def test_grouped_permissions_etag(client):
+    _, role, one, many = seed(client)
+    url = f"/api/permissions/grouped/role/{role['id']}"
+    response = client.get(url)
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+    assert all(p['has_permission'] for group in response.json for p in group['permissions'])
+
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+
+    client.put(f"/api/role-permissions/role/{role['id']}", json={'permission_ids': [many['id']]})
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    flags = {p['id']: p['has_permission'] for group in response.json for p in group['permissions']}
+    assert flags == {one['id']: False, many['id']: True}
+
+
+def test_replace_role_permissions_applies_the_diff(client):
+    user, role, one, many = seed(client)
+    other = client.post('/api/permissions/', json={'url': '/roles', 'method': 'GET', 'entity': 'Roles'}).json
+    url = f"/api/role-permissions/role/{role['id']}"
+
+    response = client.put(url, json={'permission_ids': [many['id'], other['id']]})
+    assert response.status_code == 200
+    assert response.json['added'] == [other['id']]
+    assert response.json['removed'] == [one['id']]
+    assert rbac_engine.authorize_many(user['id'], [('/users/1', 'GET'), ('/users', 'GET'), ('/roles', 'GET')]) \
+        == [False, True, True]
+
+    response = client.put(url, json={'permission_ids': [many['id'], other['id']]})
+    assert (response.json['added'], response.json['removed']) == ([], [])
+    assert client.put(url, json={'permission_ids': ['x']}).status_code == 400
+    assert client.put(url, json={'permission_ids': [999]}).status_code == 404
+
+
+def test_middleware_enforces_mapped_routes(client):
+    user, role, one, many = seed(client)
+    client.post('/api/permissions/', json={'url': '/roles', 'method': 'GET', 'entity': 'Roles'})
+    token = client.post(f"/api/sessions/user/{user['id']}", json={}).json['token']
+    headers = {'Authorization': f'Bearer {token}'}
+    client.application.config['RBAC_ENFORCE'] = True
+
+    assert client.get('/api/users/').status_code == 401
+    assert client.get('/api/users/', headers=headers).status_code == 200
+    # Mapped to a permission the user's role does not have
+    assert client.get('/api/roles/', headers=headers).status_code == 403
+    # Unmapped routes pass unless RBAC_ENFORCE_UNMAPPED is set
+    assert client.get('/api/devices/', headers=headers).status_code == 200
+    client.application.config['RBAC_ENFORCE_UNMAPPED'] = True
+    assert client.get('/api/devices/', headers=headers).status_code == 403
+    # Exempt blueprints and endpoints need no token
+    assert client.post('/api/authorize/', json={'user_id': user['id'], 'url': '/users', 'method': 'GET'}).status_code == 200
+    assert client.post('/api/sessions/validate', json={'token': token}).status_code == 200
+
+
+def test_trie_matches_linear_scan():
+    templates = build_templates(500)
+    # The trie prefers static segments, like a scan over the most specific templates first
+    ordered = sorted(templates, key=lambda t: (t[0].count(WILDCARD), t[2]))
+    trie = RouteTrie()
+    for segments, method, permission_id in templates:
+        trie.insert(segments, method, permission_id)
+
+    paths = concrete_paths(templates, 500) + [(('entity0', '1', 'missing'), 'GET'), (('unknown',), 'GET')]
+    assert [trie.match(s, m) for s, m in paths] == [linear_match(ordered, s, m) for s, m in paths]
+
+    segments, method, permission_id = templates[0]
+    assert trie.remove(segments, method, permission_id)
+    assert trie.find(segments, method) is None
+    assert len(trie) == len(templates) - 1
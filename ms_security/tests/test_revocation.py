@@ -0,0 +1,19 @@
+import pytest
+from app.business.services.revocation_list import revocation_list
+
+
+@pytest.mark.parametrize('store', ['sql', 'memory'])
+def test_revoked_signed_tokens_stop_validating(make_app, store):
+    app = make_app(SESSION_STORE=store, SESSION_TOKEN_MODE='signed')
+    client = app.test_client()
+    user = client.post('/api/users/', json={'name': 'a', 'email': 'a@example.com'}).json
+    session = client.post(f"/api/sessions/user/{user['id']}", json={}).json
+    assert client.post('/api/sessions/validate', json={'token': session['token']}).status_code == 200
+
+    client.post(f"/api/sessions/user/{user['id']}/revoke")
+
+    response = client.post('/api/sessions/validate', json={'token': session['token']})
+    assert response.status_code == 401
+    # A reload, as done by the scheduled refresh, keeps the revocation
+    revocation_list.refresh()
+    assert client.post('/api/sessions/validate', json={'token': session['token']}).status_code == 401
@@ -0,0 +1,87 @@
+import pytest
+from app.data.database import db
+from app.business.models.role_closure import RoleClosure
+from app.business.services.rbac_engine import rbac_engine
+
+
+@pytest.fixture
+def client(make_app):
+    app = make_app()
+    rbac_engine.load()
+    return app.test_client()
+
+
+def make_roles(client, *names):
+    return [client.post('/api/roles/', json={'name': name}).json['id'] for name in names]
+
+
+def closure():
+    return {(a, d, depth) for a, d, depth in db.session.query(
+        RoleClosure.ancestor_id, RoleClosure.descendant_id, RoleClosure.depth)}
+
+
+def test_set_parent_builds_the_closure(client):
+    root, middle, leaf = make_roles(client, 'root', 'middle', 'leaf')
+    assert client.put(f'/api/roles/{middle}/parent', json={'parent_id': root}).status_code == 200
+    assert client.put(f'/api/roles/{leaf}/parent', json={'parent_id': middle}).status_code == 200
+
+    assert closure() == {(root, middle, 1), (middle, leaf, 1), (root, leaf, 2)}
+    hierarchy = client.get(f'/api/roles/{leaf}/hierarchy').json
+    assert (hierarchy['parent_id'], hierarchy['ancestors']) == (middle, [middle, root])
+    assert sorted(client.get(f'/api/roles/{root}/hierarchy').json['descendants']) == [middle, leaf]
+
+
+def test_inherited_permissions(client):
+    parent, child = make_roles(client, 'parent', 'child')
+    permission = client.post('/api/permissions/', json={'url': '/users', 'method': 'GET', 'entity': 'Users'}).json
+    client.post(f"/api/role-permissions/role/{parent}/permission/{permission['id']}", json={})
+    client.put(f'/api/roles/{child}/parent', json={'parent_id': parent})
+
+    assert [p['id'] for p in client.get(f'/api/roles/{child}/permissions').json] == [permission['id']]
+    assert client.get(f'/api/roles/{parent}/permissions').status_code == 200
+
+
+@pytest.mark.parametrize('depth', [0, 1, 2])
+def test_cycles_are_rejected(client, depth):
+    roles = make_roles(client, 'a', 'b', 'c')
+    for parent, child in zip(roles, roles[1:]):
+        client.put(f'/api/roles/{child}/parent', json={'parent_id': parent})
+    before = closure()
+
+    # The root under itself or under one of its descendants
+    response = client.put(f'/api/roles/{roles[0]}/parent', json={'parent_id': roles[depth]})
+    assert response.status_code == 400
+    assert closure() == before
+
+
+@pytest.mark.parametrize('parent_id', ['1', 1.5, True, [1]])
+def test_parent_id_must_be_an_integer(client, parent_id):
+    role, = make_roles(client, 'a')
+    response = client.put(f'/api/roles/{role}/parent', json={'parent_id': parent_id})
+    assert response.status_code == 400
+    assert closure() == set()
+
+
+def test_moving_a_subtree_rewrites_its_paths(client):
+    a, b, c, d = make_roles(client, 'a', 'b', 'c', 'd')
+    client.put(f'/api/roles/{b}/parent', json={'parent_id': a})
+    client.put(f'/api/roles/{c}/parent', json={'parent_id': b})
+
+    # Move b (with c) from a to d
+    assert client.put(f'/api/roles/{b}/parent', json={'parent_id': d}).status_code == 200
+    assert closure() == {(d, b, 1), (b, c, 1), (d, c, 2)}
+
+    # Detach b; c stays under it
+    assert client.put(f'/api/roles/{b}/parent', json={'parent_id': None}).status_code == 200
+    assert closure() == {(b, c, 1)}
+
+
+def test_remove_role_makes_children_roots(client):
+    a, b, c, d = make_roles(client, 'a', 'b', 'c', 'd')
+    client.put(f'/api/roles/{b}/parent', json={'parent_id': a})
+    client.put(f'/api/roles/{c}/parent', json={'parent_id': b})
+    client.put(f'/api/roles/{d}/parent', json={'parent_id': c})
+
+    assert client.delete(f'/api/roles/{b}').status_code == 200
+    assert closure() == {(c, d, 1)}
+    assert client.get(f'/api/roles/{c}/hierarchy').json['parent_id'] is None
@@ -0,0 +1,34 @@
+import sqlite3
+from sqlalchemy import inspect
+from app.data.database import db
+
+# Tables as created before the password and session indexes were added
+OLD_TABLES = """
+CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL, email VARCHAR(120) NOT NULL UNIQUE,
+                    created_at DATETIME, updated_at DATETIME);
+CREATE TABLE passwords (id INTEGER PRIMARY KEY, content VARCHAR(255) NOT NULL, "startAt" DATETIME NOT NULL,
+                        "endAt" DATETIME, created_at DATETIME, updated_at DATETIME,
+                        user_id INTEGER NOT NULL REFERENCES users (id));
+CREATE TABLE sessions (id VARCHAR(36) PRIMARY KEY, token VARCHAR(255) NOT NULL, expiration DATETIME NOT NULL,
+                       "FACode" VARCHAR(10), state VARCHAR(20) NOT NULL, created_at DATETIME, updated_at DATETIME,
+                       user_id INTEGER NOT NULL REFERENCES users (id));
+INSERT INTO users (id, name, email) VALUES (1, 'a', 'a@example.com');
+INSERT INTO sessions (id, token, expiration, state, user_id) VALUES ('s1', 'tok', '2099-01-01 00:00:00', 'active', 1);
+"""
+
+
+def test_existing_database_gets_new_columns_and_indexes(make_app, tmp_path):
+    path = tmp_path / 'old.db'
+    with sqlite3.connect(path) as connection:
+        connection.executescript(OLD_TABLES)
+
+    make_app(SQLALCHEMY_DATABASE_URI=f"sqlite:///{path}")
+
+    inspector = inspect(db.engine)
+    password_indexes = {index['name'] for index in inspector.get_indexes('passwords')}
+    assert {'ix_passwords_user_current', 'ix_passwords_user_open'} <= password_indexes
+    session_indexes = {index['name']: index for index in inspector.get_indexes('sessions')}
+    assert {'ix_sessions_expiration', 'ix_sessions_state', 'ix_sessions_ip'} <= set(session_indexes)
+    assert session_indexes['ix_sessions_token_hash']['unique']
+    # Existing sessions get their token hash
+    assert db.session.execute(db.text("SELECT token_hash FROM sessions")).scalar() is not None
@@ -0,0 +1,13 @@
+def test_set_state_requires_a_selecting_filter(make_app):
+    client = make_app().test_client()
+    users = [client.post('/api/users/', json={'name': name, 'email': f"{name}@example.com"}).json for name in 'abc']
+    for user in users:
+        client.post(f"/api/sessions/user/{user['id']}", json={})
+
+    response = client.put('/api/sessions/state', json={'state': 'revoked', 'from_state': 'active'})
+    assert response.status_code == 400
+
+    response = client.put('/api/sessions/state', json={'state': 'revoked', 'from_state': 'active',
+                                                       'user_id': users[0]['id']})
+    assert response.json['updated'] == 1
+    assert {s['state'] for s in client.get('/api/sessions/').json} == {'active', 'revoked'}
@@ -0,0 +1,23 @@
+import pytest
+from app.business.services.session_stats import session_stats
+
+
+@pytest.mark.parametrize('store', ['sql', 'memory'])
+def test_stats_endpoint_reuses_the_snapshot(make_app, store):
+    client = make_app(SESSION_STORE=store, SESSION_STATS_TTL=3600).test_client()
+    session_stats.clear()
+    user = client.post('/api/users/', json={'name': 'a', 'email': 'a@example.com'}).json
+    client.post(f"/api/sessions/user/{user['id']}", json={})
+
+    first = client.get('/api/sessions/stats').json
+    assert set(first) == {'total', 'active', 'expired', 'by_state', 'top_users', 'created_per_hour', 'computed_at'}
+    assert (first['total'], first['active'], first['expired']) == (1, 1, 0)
+    assert first['top_users'] == [{'user_id': user['id'], 'sessions': 1}]
+
+    # Within SESSION_STATS_TTL the same snapshot is served
+    client.post(f"/api/sessions/user/{user['id']}", json={'expiration': '2000-01-01 00:00:00'})
+    assert client.get('/api/sessions/stats').json == first
+
+    session_stats.clear()
+    second = client.get('/api/sessions/stats').json
+    assert (second['total'], second['active'], second['expired']) == (2, 1, 1)
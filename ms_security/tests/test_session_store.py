@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta
+import pytest
+from app.data.database import db
+from app.business.models.user import User
+from app.business.services.session_store import SESSION_STORES, get_session_store, hash_token
+
+
+@pytest.fixture(params=sorted(SESSION_STORES))
+def store(request, make_app):
+    make_app(SESSION_STORE=request.param)
+    for user_id in (1, 2):
+        db.session.add(User(id=user_id, name=f"user{user_id}", email=f"user{user_id}@example.com"))
+    db.session.commit()
+    return get_session_store()
+
+
+def fields(token, hours=1, **extra):
+    return dict({'token': token, 'expiration': datetime.utcnow() + timedelta(hours=hours),
+                 'FACode': None, 'ip': None, 'state': 'active'}, **extra)
+
+
+def test_create_get_and_lookup(store):
+    session = store.create(1, fields('tok-1', ip='10.0.0.1'), session_id='s1')
+
+    assert session['id'] == 's1' and session['ip'] == '10.0.0.1'
+    assert 'token_hash' not in session
+    assert store.get('s1') == session
+    assert [s['id'] for s in store.for_user(1)] == ['s1']
+    assert store.lookup(hash_token('tok-1'))[:2] == ('s1', 1)
+    assert store.lookup(hash_token('missing')) is None
+
+
+def test_update_moves_the_token_index(store):
+    store.create(1, fields('old'), session_id='s1')
+
+    updated = store.update('s1', {'token': 'new', 'state': 'revoked'})
+
+    assert updated['token'] == 'new' and updated['state'] == 'revoked'
+    assert store.lookup(hash_token('old')) is None
+    assert store.lookup(hash_token('new'))[3] == 'revoked'
+    assert store.update('missing', {'state': 'active'}) is None
+
+
+def test_set_state_applies_all_filters(store):
+    store.create(1, fields('a', ip='10.0.0.1'), session_id='a')
+    store.create(1, fields('b', ip='10.0.0.2'), session_id='b')
+    store.create(2, fields('c', ip='10.0.0.1'), session_id='c')
+    store.create(2, fields('d', state='revoked'), session_id='d')
+
+    changed = store.set_state({'user_id': 1, 'ip': '10.0.0.1'}, 'revoked')
+    assert [token_hash for token_hash, _ in changed] == [hash_token('a')]
+
+    changed = store.set_state({'user_ids': [1, 2], 'state': 'active'}, 'password_expired')
+    assert sorted(token_hash for token_hash, _ in changed) == sorted([hash_token('b'), hash_token('c')])
+    assert store.get('d')['state'] == 'revoked'
+
+
+def test_delete_and_delete_for_user(store):
+    expiration = fields('a')['expiration']
+    store.create(1, fields('a', expiration=expiration), session_id='a')
+    store.create(1, fields('b'), session_id='b')
+    store.create(2, fields('c'), session_id='c')
+
+    assert store.delete('a') == (hash_token('a'), expiration)
+    assert store.delete('a') is None
+    removed = store.delete_for_user(1)
+    db.session.commit()
+    assert [token_hash for token_hash, _ in removed] == [hash_token('b')]
+    assert [s['id'] for s in store.all()] == ['c']
+
+
+def test_purge_removes_expired_and_terminated_sessions(store):
+    store.create(1, fields('expired', hours=-1), session_id='expired')
+    store.create(1, fields('revoked', state='revoked'), session_id='revoked')
+    store.create(1, fields('active'), session_id='active')
+
+    removed = store.purge(datetime.utcnow() + timedelta(seconds=1), ['revoked'], 10)
+
+    assert sorted(token_hash for token_hash, _ in removed) == sorted([hash_token('expired'), hash_token('revoked')])
+    assert [s['id'] for s in store.all()] == ['active']
+
+
+def test_stats_count_expired_sessions_until_purged(store):
+    store.create(1, fields('a'), session_id='a')
+    store.create(1, fields('b', hours=-1), session_id='b')
+    store.create(2, fields('c', state='revoked'), session_id='c')
+    now = datetime.utcnow()
+
+    stats = store.stats(now, 1, now - timedelta(hours=1))
+    assert {name: stats[name] for name in ('total', 'active', 'expired', 'by_state', 'top_users')} == {
+        'total': 3, 'active': 1, 'expired': 1, 'by_state': {'active': 2, 'revoked': 1},
+        'top_users': [{'user_id': 1, 'sessions': 2}]
+    }
+    assert sum(stats['created_per_hour'].values()) == 3
+    # Reading the session does not drop it
+    assert store.get('b')['id'] == 'b'
+    assert store.stats(now, 1, now)['expired'] == 1
+
+
+def test_record_activity_keeps_the_newest_time(store):
+    store.create(1, fields('a'), session_id='a')
+    newer, older = datetime(2030, 1, 2), datetime(2030, 1, 1)
+
+    store.record_activity({'a': newer, 'missing': newer})
+    store.record_activity({'a': older})
+
+    assert store.get('a')['last_activity_at'] == newer
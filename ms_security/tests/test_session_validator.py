@@ -0,0 +1,31 @@
+from datetime import datetime, timedelta
+import pytest
+from app.business.services.activity_tracker import activity_tracker
+from app.business.services.session_store import get_session_store
+from app.business.services.session_validator import session_validator
+
+
+@pytest.mark.parametrize('token', [123, ['abc'], {'token': 'abc'}, True])
+@pytest.mark.parametrize('mode', ['opaque', 'signed'])
+def test_validate_rejects_non_string_tokens(make_app, mode, token):
+    client = make_app(SESSION_TOKEN_MODE=mode).test_client()
+    response = client.post('/api/sessions/validate', json={'token': token})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('store', ['sql', 'memory'])
+def test_idle_timeout_sees_activity_flushed_after_caching(make_app, store):
+    app = make_app(SESSION_STORE=store, SESSION_IDLE_TIMEOUT=60)
+    client = app.test_client()
+    user = client.post('/api/users/', json={'name': 'a', 'email': 'a@example.com'}).json
+    session = client.post(f"/api/sessions/user/{user['id']}", json={}).json
+    started = datetime.utcnow()
+    get_session_store().record_activity({session['id']: started})
+
+    # Cached with last_activity_at=started, then used and flushed
+    assert session_validator.validate(session['token'], now=started + timedelta(seconds=50))[1] is None
+    activity_tracker.flush()
+
+    assert session_validator.validate(session['token'], now=started + timedelta(seconds=62))[1] is None
+    activity_tracker.flush()
+    assert session_validator.validate(session['token'], now=started + timedelta(seconds=200))[1] == "Session idle timeout"
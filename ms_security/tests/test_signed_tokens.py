@@ -0,0 +1,21 @@
+from datetime import datetime
+from app.business.services import signed_tokens
+
+
+def test_sign_and_verify_round_trip():
+    expiration = datetime(2030, 1, 1, 12, 0, 0)
+    token = signed_tokens.sign(7, 'session-id', expiration, 'secret')
+
+    assert signed_tokens.is_signed(token)
+    assert signed_tokens.verify(token, 'secret') == (7, 'session-id', expiration)
+
+
+def test_verify_rejects_other_secrets_and_tampering():
+    token = signed_tokens.sign(7, 'session-id', datetime(2030, 1, 1), 'secret')
+    payload, signature = token[len(signed_tokens.PREFIX):].split('.')
+    forged = signed_tokens.sign(8, 'session-id', datetime(2030, 1, 1), 'other')
+
+    assert signed_tokens.verify(token, 'other') is None
+    assert signed_tokens.verify(signed_tokens.PREFIX + forged.split('.')[1] + '.' + signature, 'secret') is None
+    assert signed_tokens.verify('opaque-token', 'secret') is None
+    assert signed_tokens.verify(signed_tokens.PREFIX + 'garbage', 'secret') is None